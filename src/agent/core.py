@@ -1,16 +1,19 @@
 import json
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator
 from openai import OpenAI
+from openai.types.chat import ChatCompletionMessageToolCall
 import google.generativeai as genai
 from google.generativeai.types import content_types
 from collections.abc import Iterable
 
-from config import config
+from config import get_config
 from tools.search_tool import SearchTool
 
 class CodeAgent:
     def __init__(self):
         self.search_tool = SearchTool()
+        config = get_config()
         self.provider = config.chat_provider
         
         config.validate_chat_config()
@@ -26,6 +29,7 @@ class CodeAgent:
     
     def _init_openai(self):
         """Initialize OpenAI client."""
+        config = get_config()
         self.client = OpenAI(api_key=config.openai_api_key)
         self.model_name = config.chat_model
         self.tools = [self.search_tool.get_tool_definition()]
@@ -35,6 +39,7 @@ class CodeAgent:
     
     def _init_gemini(self):
         """Initialize Gemini client."""
+        config = get_config()
         genai.configure(api_key=config.gemini_api_key)
         
         # Map the function directly for Gemini
@@ -51,6 +56,7 @@ class CodeAgent:
     
     def _init_ollama(self):
         """Initialize Ollama client using OpenAI-compatible API."""
+        config = get_config()
         from openai import OpenAI as OllamaClient
         
         self.client = OllamaClient(
@@ -71,6 +77,14 @@ class CodeAgent:
         elif self.provider == "ollama":
             return self._chat_ollama(user_input)
 
+    def chat_stream(self, user_input: str) -> Iterator[str]:
+        """Like chat(), but yields the reply in pieces as the model produces them."""
+        if self.provider in ["openai", "ollama"]:
+            yield from self._chat_openai_stream(user_input)
+        elif self.provider == "gemini":
+            # The Gemini SDK cannot stream with automatic function calling enabled
+            yield self._chat_gemini(user_input)
+
     def _chat_openai(self, user_input: str) -> str:
         self.messages.append({"role": "user", "content": user_input})
 
@@ -86,22 +100,80 @@ class CodeAgent:
             self.messages.append(response_message)
 
             if response_message.tool_calls:
-                for tool_call in response_message.tool_calls:
-                    function_name = tool_call.function.name
-                    function_args = json.loads(tool_call.function.arguments)
-                    
-                    if function_name == "search_codebase":
-                        tool_output = self.search_tool.search_codebase(**function_args)
-                        
-                        self.messages.append({
-                            "tool_call_id": tool_call.id,
-                            "role": "tool",
-                            "name": function_name,
-                            "content": tool_output,
-                        })
+                self.messages.extend(self._run_tool_calls(response_message.tool_calls))
             else:
                 return response_message.content
 
+    def _chat_openai_stream(self, user_input: str) -> Iterator[str]:
+        self.messages.append({"role": "user", "content": user_input})
+
+        while True:
+            stream = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=self.messages,
+                tools=self.tools,
+                tool_choice="auto",
+                stream=True
+            )
+
+            # Text is yielded as it arrives; tool calls arrive in fragments keyed by index
+            content_parts = []
+            tool_call_parts: Dict[int, Dict[str, str]] = {}
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content_parts.append(delta.content)
+                    yield delta.content
+                for fragment in delta.tool_calls or []:
+                    part = tool_call_parts.setdefault(fragment.index, {"id": "", "name": "", "arguments": ""})
+                    if fragment.id:
+                        part["id"] = fragment.id
+                    if fragment.function and fragment.function.name:
+                        part["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        part["arguments"] += fragment.function.arguments
+
+            tool_calls = [
+                ChatCompletionMessageToolCall(
+                    id=part["id"],
+                    type="function",
+                    function={"name": part["name"], "arguments": part["arguments"]}
+                )
+                for _, part in sorted(tool_call_parts.items())
+            ]
+            message: Dict[str, Any] = {"role": "assistant", "content": "".join(content_parts) or None}
+            if tool_calls:
+                message["tool_calls"] = [tool_call.model_dump() for tool_call in tool_calls]
+            self.messages.append(message)
+
+            if not tool_calls:
+                return
+            self.messages.extend(self._run_tool_calls(tool_calls))
+
+    def _run_tool_calls(self, tool_calls) -> List[Dict[str, Any]]:
+        """Run all tool calls of one model turn concurrently, keeping their order."""
+        if len(tool_calls) == 1:
+            return [self._run_tool_call(tool_calls[0])]
+        with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+            return list(executor.map(self._run_tool_call, tool_calls))
+
+    def _run_tool_call(self, tool_call) -> Dict[str, Any]:
+        function_name = tool_call.function.name
+        if function_name == "search_codebase":
+            function_args = json.loads(tool_call.function.arguments)
+            tool_output = self.search_tool.search_codebase(**function_args)
+        else:
+            # Every tool call needs a reply, or the next request is rejected
+            tool_output = f"Error: Unknown tool '{function_name}'"
+        return {
+            "tool_call_id": tool_call.id,
+            "role": "tool",
+            "name": function_name,
+            "content": tool_output,
+        }
+
     def _chat_gemini(self, user_input: str) -> str:
         try:
             response = self.chat_session.send_message(user_input)
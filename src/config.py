@@ -1,37 +1,62 @@
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from dotenv import load_dotenv
 from typing import List, Optional
 
-# Load environment variables from .env file
-load_dotenv()
+# Set once .env has been loaded into the environment. Worker processes inherit
+# the environment, so they can skip reading the file again.
+_LOADED_FLAG = "_CONFIG_LOADED"
 
+
+@dataclass(frozen=True, slots=True)
 class AgentConfig:
-    def __init__(self):
-        # API Keys
-        self.openai_api_key = os.getenv("OPENAI_API_KEY")
-        self.gemini_api_key = os.getenv("GEMINI_API_KEY")
-        
-        # Embedding Model Configuration
-        self.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "default")  # openai, gemini, default, ollama
-        self.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")  # or mxbai-embed-large for ollama
-        
-        # Chat Model Configuration
-        self.chat_provider = os.getenv("CHAT_PROVIDER", "gemini")  # openai, gemini, ollama
-        self.chat_model = os.getenv("CHAT_MODEL", "gemini-1.5-flash")  # or llama3.2, qwen2.5, etc for ollama
-        
-        # Ollama Configuration
-        self.ollama_base_url = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
-        
+    # API Keys
+    openai_api_key: Optional[str]
+    gemini_api_key: Optional[str]
+
+    # Embedding Model Configuration
+    embedding_provider: str  # openai, gemini, default, ollama
+    embedding_model: str
+
+    # Chat Model Configuration
+    chat_provider: str  # openai, gemini, ollama
+    chat_model: str
+
+    # Ollama Configuration
+    ollama_base_url: str
+
+    project_root: str
+
+    # Indexing: documents embedded per vector store write
+    embed_batch: int
+
+    @classmethod
+    def from_env(cls) -> "AgentConfig":
+        """Resolve the configuration from environment variables."""
+        chat_provider = os.getenv("CHAT_PROVIDER", "gemini")
+        chat_model = os.getenv("CHAT_MODEL", "gemini-1.5-flash")  # or llama3.2, qwen2.5, etc for ollama
+
         # Legacy support (deprecated but kept for backward compatibility)
         legacy_provider = os.getenv("MODEL_PROVIDER")
         if legacy_provider and not os.getenv("CHAT_PROVIDER"):
-            self.chat_provider = legacy_provider
+            chat_provider = legacy_provider
         legacy_model = os.getenv("MODEL_NAME")
         if legacy_model and not os.getenv("CHAT_MODEL"):
-            self.chat_model = legacy_model
-            
-        self.project_root = os.getenv("PROJECT_ROOT", "./")
-    
+            chat_model = legacy_model
+
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            gemini_api_key=os.getenv("GEMINI_API_KEY"),
+            embedding_provider=os.getenv("EMBEDDING_PROVIDER", "default"),
+            embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),  # or mxbai-embed-large for ollama
+            chat_provider=chat_provider,
+            chat_model=chat_model,
+            ollama_base_url=os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+            project_root=os.getenv("PROJECT_ROOT", "./"),
+            embed_batch=max(1, int(os.getenv("EMBED_BATCH", "256"))),
+        )
+
     def validate_embedding_config(self) -> None:
         """Validate embedding configuration."""
         if self.embedding_provider not in ["openai", "gemini", "default", "ollama"]:
@@ -39,13 +64,13 @@ class AgentConfig:
                 f"Invalid EMBEDDING_PROVIDER: {self.embedding_provider}. "
                 f"Must be one of: openai, gemini, default, ollama"
             )
-        
+
         if self.embedding_provider == "openai" and not self.openai_api_key:
             raise ValueError("EMBEDDING_PROVIDER is 'openai' but OPENAI_API_KEY is not set")
-        
+
         if self.embedding_provider == "gemini" and not self.gemini_api_key:
             raise ValueError("EMBEDDING_PROVIDER is 'gemini' but GEMINI_API_KEY is not set")
-    
+
     def validate_chat_config(self) -> None:
         """Validate chat configuration."""
         if self.chat_provider not in ["openai", "gemini", "ollama"]:
@@ -53,11 +78,18 @@ class AgentConfig:
                 f"Invalid CHAT_PROVIDER: {self.chat_provider}. "
                 f"Must be one of: openai, gemini, ollama"
             )
-        
+
         if self.chat_provider == "openai" and not self.openai_api_key:
             raise ValueError("CHAT_PROVIDER is 'openai' but OPENAI_API_KEY is not set")
-        
+
         if self.chat_provider == "gemini" and not self.gemini_api_key:
             raise ValueError("CHAT_PROVIDER is 'gemini' but GEMINI_API_KEY is not set")
 
-config = AgentConfig()
+
+@lru_cache(maxsize=1)
+def get_config() -> AgentConfig:
+    """Return the application configuration, loading .env on first use."""
+    if os.getenv(_LOADED_FLAG) != "1":
+        load_dotenv()
+        os.environ[_LOADED_FLAG] = "1"
+    return AgentConfig.from_env()
@@ -0,0 +1,155 @@
+import os
+import json
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from utils.logger import logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Format of the metadata file: a header line followed by one
+# {"path": ..., "hash": ..., "stat": ...} record per line ("stat" is optional).
+# Records are appended on save and the last one for a path wins; a null hash
+# marks a removed file.
+META_VERSION = 1
+
+# Rewrite the file once it holds this many records per live entry
+_COMPACT_RATIO = 2
+
+
+def _loads(line: bytes) -> Any:
+    return orjson.loads(line) if orjson else json.loads(line)
+
+
+def _dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj) if orjson else json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass
+class IndexMeta:
+    """Content hashes of the files indexed for one project root."""
+
+    root_path: str
+    hash_algorithm: str
+    file_hashes: Dict[str, str] = field(default_factory=dict)   # rel_path -> content hash
+    file_stats: Dict[str, str] = field(default_factory=dict)    # rel_path -> "size:mtime_ns:inode:ctime_ns" the hash was taken at
+    # State of the file on disk, used to append only what changed
+    _saved_hashes: Optional[Dict[str, str]] = field(default=None, init=False, repr=False)
+    _saved_stats: Dict[str, str] = field(default_factory=dict, init=False, repr=False)
+    _record_count: int = field(default=0, init=False, repr=False)
+
+    @staticmethod
+    def path_for(persist_path: str, root_path: str) -> str:
+        """One metadata file per project, named after the project root."""
+        digest = hashlib.sha1(root_path.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(persist_path, "index_meta", f"{digest}.jsonl")
+
+    def _header(self) -> Dict[str, Any]:
+        return {"v": META_VERSION, "root_path": self.root_path, "hash_algorithm": self.hash_algorithm}
+
+    @classmethod
+    def load(cls, path: str, root_path: str, hash_algorithm: str) -> "IndexMeta":
+        meta = cls(root_path=root_path, hash_algorithm=hash_algorithm)
+        if not os.path.exists(path):
+            return meta
+        try:
+            with open(path, 'rb') as f:
+                lines = f.read().splitlines()
+            header = _loads(lines[0]) if lines else {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index metadata {path}: {e}")
+            return meta
+        if header.get("root_path") != root_path:
+            return meta
+
+        file_hashes, file_stats, records = cls._replay(lines[1:], path)
+
+        if header.get("hash_algorithm") != hash_algorithm:
+            # Keep the paths so their entries get replaced, but force a mismatch
+            logger.info(f"Hash algorithm changed to {hash_algorithm}, re-indexing all files")
+            meta.file_hashes = {rel_path: "" for rel_path in file_hashes}
+            return meta
+
+        meta.file_hashes = file_hashes
+        meta.file_stats = file_stats
+        if records is not None and header.get("v") == META_VERSION:
+            meta._saved_hashes = dict(file_hashes)
+            meta._saved_stats = dict(file_stats)
+            meta._record_count = records
+        return meta
+
+    @staticmethod
+    def _replay(lines: List[bytes], path: str):
+        """Apply the records in order. Returns (file_hashes, file_stats, record count), count None if damaged."""
+        file_hashes: Dict[str, str] = {}
+        file_stats: Dict[str, str] = {}
+        damaged = False
+        for line in lines:
+            try:
+                record = _loads(line)
+                rel_path, file_hash = record["path"], record["hash"]
+            except (ValueError, KeyError, TypeError):
+                # e.g. a record cut short by an interrupted save
+                damaged = True
+                continue
+            if file_hash is None:
+                file_hashes.pop(rel_path, None)
+            else:
+                file_hashes[rel_path] = file_hash
+            stat = record.get("stat")
+            if stat is None:
+                file_stats.pop(rel_path, None)
+            else:
+                file_stats[rel_path] = stat
+        if damaged:
+            logger.warning(f"Skipped damaged records in index metadata {path}")
+            return file_hashes, file_stats, None
+        return file_hashes, file_stats, len(lines)
+
+    def save(self, path: str) -> None:
+        """Append records for entries changed since load/save, rewriting the file when needed."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        saved = self._saved_hashes
+        if saved is None or not os.path.exists(path):
+            self._rewrite(path)
+            return
+
+        saved_stats = self._saved_stats
+        changes = [
+            self._record(rel_path)
+            for rel_path, file_hash in self.file_hashes.items()
+            if saved.get(rel_path) != file_hash or saved_stats.get(rel_path) != self.file_stats.get(rel_path)
+        ]
+        changes.extend({"path": rel_path, "hash": None} for rel_path in saved if rel_path not in self.file_hashes)
+        if not changes:
+            return
+        if self._record_count + len(changes) > _COMPACT_RATIO * len(self.file_hashes):
+            self._rewrite(path)
+            return
+
+        with open(path, 'ab') as f:
+            f.write(b"".join(_dumps(record) + b"\n" for record in changes))
+        self._saved_hashes = dict(self.file_hashes)
+        self._saved_stats = dict(self.file_stats)
+        self._record_count += len(changes)
+
+    def _rewrite(self, path: str) -> None:
+        lines = [_dumps(self._header())]
+        lines.extend(_dumps(self._record(rel_path)) for rel_path in self.file_hashes)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(b"\n".join(lines) + b"\n")
+        os.replace(tmp_path, path)
+        self._saved_hashes = dict(self.file_hashes)
+        self._saved_stats = dict(self.file_stats)
+        self._record_count = len(self.file_hashes)
+
+    def _record(self, rel_path: str) -> Dict[str, Any]:
+        record = {"path": rel_path, "hash": self.file_hashes[rel_path]}
+        stat = self.file_stats.get(rel_path)
+        if stat is not None:
+            record["stat"] = stat
+        return record
@@ -1,88 +1,278 @@
 import os
 import json
 import hashlib
-from typing import List, Dict, Any
+import time
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from tqdm import tqdm
 from .parser import CodeParser
 from .vector_store import VectorStore
 from .schema import CodeNode
+from .index_meta import IndexMeta
+from .parse_cache import ParseCache
+from .scanner import iter_source_files
 from utils.logger import logger
+from utils.file_hash import content_hash, git_blob_hash, git_blob_hashes, hash_bytes, GIT_HASH_ALGORITHM, HASH_ALGORITHM
+
+SUPPORTED_EXTENSIONS = ['.py', '.c', '.h', '.cpp', '.hpp', '.cc', '.cxx']
+
+# Length of the code preview stored with every document
+SNIPPET_CHARS = 200
+
+# Coarsest mtime resolution of common filesystems (FAT: 2s)
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Parser owned by the current process (created lazily on first use), whether a
+# pool worker or the main process parsing without a pool. Tree-sitter parsers
+# cannot be pickled, so every worker builds its own.
+_worker_parser: Optional[CodeParser] = None
+
+
+def _get_worker_parser() -> CodeParser:
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CodeParser()
+    return _worker_parser
+
+
+def _read_source(file_path: str) -> bytes:
+    """Read a source file as raw bytes; tree-sitter parses bytes directly."""
+    with open(file_path, 'rb') as f:
+        return f.read()
+
+
+def _hash_one(file_path: str, in_git: bool = False) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Hash a file with git's blob formula inside a git work tree, HASH_ALGORITHM otherwise.
+    Returns: (hash, error) - hash is None when the file could not be read.
+    """
+    try:
+        return (git_blob_hash(file_path) if in_git else content_hash(file_path)), None
+    except OSError as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _parse_one(file_path: str, in_git: bool = False) -> Tuple[str, Optional[List[CodeNode]], Optional[str], Optional[str]]:
+    """
+    Read and parse a single file with the current process's parser.
+    Returns: (file_path, nodes, error, hash) - nodes is None when parsing failed;
+    hash is that of the bytes parsed, computed the same way as _hash_one.
+    """
+    try:
+        code = _read_source(file_path)
+        return file_path, _get_worker_parser().parse_file(file_path, code), None, hash_bytes(code, in_git)
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}", None
+
 
 class CodeIndexer:
-    def __init__(self, root_path: str):
+    def __init__(self, root_path: str, workers: Optional[int] = None):
+        """
+        workers: number of parser processes (default: one per CPU core).
+        With 1, files are parsed in this process without a pool.
+        """
+        if workers is not None and workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.workers = workers or os.cpu_count() or 1
         self.root_path = os.path.abspath(root_path)
         if not os.path.exists(self.root_path):
             raise FileNotFoundError(f"Project path does not exist: {self.root_path}")
         if not os.path.isdir(self.root_path):
             raise NotADirectoryError(f"Project path is not a directory: {self.root_path}")
         
+        # Paths produced by the scanner all start with this prefix, so relative
+        # paths can be sliced off instead of going through os.path.relpath
+        self._root_prefix = os.path.join(self.root_path, '')
+        
         logger.info(f"Initializing indexer for: {self.root_path}")
-        self.parser = CodeParser()
         self.vector_store = VectorStore()
         
     def index_project(self):
         logger.info(f"Starting indexing for project: {self.root_path}")
         
-        # 1. Collect all files to scan
-        all_files = []
-        for root, _, files in os.walk(self.root_path):
-            # Skip hidden directories and build artifacts
-            if any(part.startswith('.') for part in root.split(os.sep)):
-                continue
-            if any(skip in root for skip in ['build', 'venv', '__pycache__', 'node_modules', '.git', 'dist', 'egg-info']):
-                continue
-
-            for file in files:
-                file_path = os.path.join(root, file)
-                all_files.append(file_path)
+        # 1. Collect source files to scan
+        source_files = sorted(iter_source_files(self.root_path, SUPPORTED_EXTENSIONS))
         
-        logger.info(f"Found {len(all_files)} files to scan")
+        logger.info(f"Found {len(source_files)} source files to scan")
         
-        # 2. Index files with progress bar
+        # 2. Load the state of the previous run. Inside a git work tree every hash
+        #    is a git blob id, whichever HASH_ALGORITHM is available
+        git_hashes = git_blob_hashes(self.root_path)
+        in_git = git_hashes is not None
+        meta_path = IndexMeta.path_for(self.vector_store.persist_path, self.root_path)
+        meta = IndexMeta.load(meta_path, self.root_path, GIT_HASH_ALGORITHM if in_git else HASH_ALGORITHM)
+        if meta.file_hashes and self.vector_store.count() == 0:
+            # The collection was recreated (e.g. embedding function changed); index everything again
+            logger.info("Vector store is empty, ignoring previous index state")
+            meta.file_hashes.clear()
+            meta.file_stats.clear()
+        
+        # 3. Hash source files and compare with the previous run to find changed and removed files
+        rel_paths = {file_path: self._rel_path(file_path) for file_path in source_files}
+        new_hashes, new_stats, hash_errors = self._hash_files(source_files, rel_paths, meta, git_hashes)
+        # Unreadable files are left out of new_hashes, so their old entries are
+        # removed below and they are retried on the next run
+        changed_files = [
+            file_path for file_path in source_files
+            if rel_paths[file_path] in new_hashes
+            and meta.file_hashes.get(rel_paths[file_path]) != new_hashes[rel_paths[file_path]]
+        ]
+        stale_paths = [rel_path for rel_path in meta.file_hashes if new_hashes.get(rel_path) != meta.file_hashes[rel_path]]
+        for rel_path in stale_paths:
+            self.vector_store.delete_by_file(rel_path)
+            del meta.file_hashes[rel_path]
+        
+        unchanged_count = len(source_files) - len(changed_files) - hash_errors
+        logger.info(f"{len(changed_files)} changed, {unchanged_count} unchanged source files")
+        
+        # 4. Reuse cached parse results, parse the rest across CPU cores
         indexed_count = 0
         skipped_count = 0
-        error_count = 0
+        error_count = hash_errors
+        
+        parse_cache = ParseCache(ParseCache.path_for(self.vector_store.persist_path))
+        cache_keys = {
+            file_path: ParseCache.make_key(rel_paths[file_path], new_hashes[rel_paths[file_path]])
+            for file_path in changed_files
+        }
+        cached_nodes = parse_cache.get_many(cache_keys)
+        new_entries = {}
         
-        for file_path in tqdm(all_files, desc="Indexing files"):
-            result = self._index_file(file_path)
+        parsed = self._parse_files(changed_files, cached_nodes, in_git)
+        for file_path, nodes, error, parsed_hash in tqdm(parsed, total=len(changed_files), desc="Indexing files"):
+            rel_path = rel_paths[file_path]
+            if error is not None:
+                logger.error(f"Failed to index {file_path}: {error}")
+                result = "error"
+            else:
+                if file_path in cached_nodes or parsed_hash == new_hashes[rel_path]:
+                    if file_path not in cached_nodes:
+                        new_entries[cache_keys[file_path]] = nodes
+                else:
+                    # Saved again after it was hashed: the nodes belong to neither
+                    # the cache key nor the recorded hash. Track the file under the
+                    # content actually parsed (so its entries are replaced once it
+                    # differs) and don't trust its stat on the next run.
+                    logger.info(f"{file_path} changed while indexing, will be checked again next run")
+                    new_hashes[rel_path] = parsed_hash
+                    new_stats.pop(rel_path, None)
+                result = self._store_nodes(file_path, nodes)
             if result == "indexed":
                 indexed_count += 1
             elif result == "skipped":
                 skipped_count += 1
             else:
                 error_count += 1
+            # Errors are left out so the file is retried on the next run
+            if result != "error":
+                meta.file_hashes[rel_path] = new_hashes[rel_path]
         
-        # 3. Report results
-        logger.info(f"Indexing complete. Indexed: {indexed_count}, Skipped: {skipped_count}, Errors: {error_count}")
+        meta.file_stats = {rel_path: new_stats[rel_path] for rel_path in meta.file_hashes if rel_path in new_stats}
+        self.vector_store.flush()
+        parse_cache.put_many(new_entries)
+        parse_cache.close()
+        meta.save(meta_path)
+        
+        # 5. Report results
+        logger.info(f"Indexing complete. Indexed: {indexed_count}, Unchanged: {unchanged_count}, Skipped: {skipped_count}, Errors: {error_count}")
         print(f"\n✅ Indexing complete!")
         print(f"   📁 Indexed: {indexed_count} files")
+        print(f"   💤 Unchanged: {unchanged_count} files")
         print(f"   ⏭️  Skipped: {skipped_count} files")
         print(f"   ❌ Errors: {error_count} files")
                 
-    def _index_file(self, file_path: str) -> str:
+    def _hash_files(
+        self, source_files: List[str], rel_paths: Dict[str, str], meta: IndexMeta, git_hashes: Optional[Dict[str, str]]
+    ) -> Tuple[Dict[str, str], Dict[str, str], int]:
         """
-        Parses and indexes a single file.
-        Returns: 'indexed', 'skipped', or 'error'
+        Content hashes of source_files by relative path, the
+        "size:mtime_ns:inode:ctime_ns" stat of every file that was checked against its stat, and the number of
+        files that could not be read (these are logged and have no hash).
+        Git already knows the blob hash of clean tracked files, and a file whose
+        stat matches the previous run keeps its recorded hash; only the
+        rest are read and hashed (I/O bound, so threads overlap the reads).
+        Inside a git work tree those are hashed the way git does too, so a file
+        keeps its hash when it is staged or committed without further edits
+        (git_hashes is None outside a git work tree).
+        """
+        in_git = git_hashes is not None
+        git_hashes = git_hashes or {}
+        # Files modified this recently could still change within the same mtime
+        # tick, so their stat is not trusted on the next run
+        trusted_before = time.time_ns() - _RACY_WINDOW_NS
+        new_hashes = {}
+        new_stats = {}
+        to_hash = []
+        for file_path in source_files:
+            rel_path = rel_paths[file_path]
+            if rel_path in git_hashes:
+                new_hashes[rel_path] = git_hashes[rel_path]
+                continue
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                to_hash.append(file_path)
+                continue
+            # Inode and ctime catch replacements that keep size and mtime
+            # (cp -p, rsync -a, tar x); ctime cannot be set by the writer
+            stat = f"{st.st_size}:{st.st_mtime_ns}:{st.st_ino}:{st.st_ctime_ns}"
+            old_hash = meta.file_hashes.get(rel_path)
+            if stat == meta.file_stats.get(rel_path) and old_hash is not None:
+                new_hashes[rel_path] = old_hash
+            else:
+                to_hash.append(file_path)
+            if st.st_mtime_ns < trusted_before:
+                new_stats[rel_path] = stat
+        
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 4)) as executor:
+            results = list(tqdm(
+                executor.map(partial(_hash_one, in_git=in_git), to_hash),
+                total=len(to_hash), desc="Hashing files"
+            ))
+        error_count = 0
+        for file_path, (file_hash, error) in zip(to_hash, results):
+            if error is not None:
+                logger.error(f"Failed to index {file_path}: {error}")
+                new_stats.pop(rel_paths[file_path], None)
+                error_count += 1
+            else:
+                new_hashes[rel_paths[file_path]] = file_hash
+        return new_hashes, new_stats, error_count
+
+    def _rel_path(self, file_path: str) -> str:
+        """Path of file_path relative to the project root."""
+        if file_path.startswith(self._root_prefix):
+            return file_path[len(self._root_prefix):]
+        return os.path.relpath(file_path, self.root_path)
+
+    def _parse_files(self, file_paths: List[str], cached_nodes: Dict[str, List[CodeNode]], in_git: bool = False):
+        """
+        Yield (file_path, nodes, error, hash) for each file, parsing cache misses in
+        worker processes. hash is that of the bytes parsed, None for cached nodes.
         """
-        # 1. Filter by extension
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext not in ['.py', '.c', '.h', '.cpp', '.hpp', '.cc', '.cxx']:
-            return "skipped"
+        to_parse = []
+        for file_path in file_paths:
+            if file_path in cached_nodes:
+                yield file_path, cached_nodes[file_path], None, None
+            else:
+                to_parse.append(file_path)
+        if not to_parse:
+            return
+        if self.workers == 1 or len(to_parse) == 1:
+            # Not worth starting processes for
+            for file_path in to_parse:
+                yield _parse_one(file_path, in_git)
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                yield from executor.map(partial(_parse_one, in_git=in_git), to_parse, chunksize=8)
 
+    def _store_nodes(self, file_path: str, nodes: List[CodeNode]) -> str:
+        """
+        Embeds and stores the parsed nodes of a single file.
+        Returns: 'indexed', 'skipped', or 'error'
+        """
         try:
-            # 2. Read file content (Handle encoding issues)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    code = f.read()
-            except UnicodeDecodeError:
-                logger.warning(f"UTF-8 decode failed for {file_path}, trying with errors='replace'")
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    code = f.read()
-            
-            # 3. Parse file using the new CodeParser
-            # This returns a list of CodeNode objects containing rich metadata
-            nodes: List[CodeNode] = self.parser.parse_file(file_path, code)
-            
             if not nodes:
                 logger.debug(f"No definitions found in {file_path}")
                 return "skipped"
@@ -90,11 +280,17 @@ class CodeIndexer:
             documents = []
             metadatas = []
             ids = []
+            seen_ids = set()
             
-            rel_path = os.path.relpath(file_path, self.root_path)
+            rel_path = self._rel_path(file_path)
+            
+            # Parsers attach the same file-level imports list to every node,
+            # so only re-join it when a different list shows up
+            last_imports = None
+            imports_text = ""
 
             for i, node in enumerate(nodes):
-                # 4. Construct embedding text
+                # 1. Construct embedding text
                 # Inject docstring/signature into the content to improve semantic search
                 parts = []
                 if node.docstring:
@@ -110,14 +306,16 @@ class CodeIndexer:
                 
                 documents.append(embed_text)
                 
-                # 5. Build metadata (Flatten lists to strings for vector DB compatibility)
+                # 2. Build metadata (Flatten lists to strings for vector DB compatibility)
                 metadata = {
                     'file_path': rel_path,
                     'name': node.name,
                     'type': node.type,
                     'language': node.language,
                     'start_line': node.start_line,
-                    'end_line': node.end_line
+                    'end_line': node.end_line,
+                    # Short preview so searches can show results without fetching documents
+                    'snippet': node.content[:SNIPPET_CHARS] + "..." if len(node.content) > SNIPPET_CHARS else node.content
                 }
                 
                 # Add optional fields if they exist
@@ -131,13 +329,16 @@ class CodeIndexer:
 
                 # Join lists into strings (e.g., ['pandas', 'numpy'] -> "pandas, numpy")
                 if node.imports:
-                    metadata['imports'] = ", ".join(node.imports)[:1000] # Truncate for safety
+                    if node.imports is not last_imports:
+                        last_imports = node.imports
+                        imports_text = ", ".join(node.imports)[:1000] # Truncate for safety
+                    metadata['imports'] = imports_text
                 if node.arguments:
                     metadata['arguments'] = json.dumps(node.arguments)
                 
                 metadatas.append(metadata)
                 
-                # 6. Generate unique ID
+                # 3. Generate unique ID
                 # Format: "path:kind:name:line:hash"
                 sig_seed = "|".join([
                     node.signature or "",
@@ -150,18 +351,21 @@ class CodeIndexer:
 
                 unique_id = base_id
                 suffix = 1
-                while unique_id in ids:
+                while unique_id in seen_ids:
                     suffix += 1
                     unique_id = f"{base_id}:{suffix}"
+                seen_ids.add(unique_id)
                 ids.append(unique_id)
                 
-            # 7. Add to Vector Store
-            if documents:
-                self.vector_store.add_documents(documents, metadatas, ids)
-                return "indexed"
-                
         except Exception as e:
             logger.error(f"Failed to index {file_path}: {type(e).__name__}: {e}")
             return "error"
         
+        # 4. Add to Vector Store. Writes are batched across files, so a failed
+        #    write cannot be pinned on this file and aborts the run instead
+        #    (the index state is then not saved and every file is retried)
+        if documents:
+            self.vector_store.add_documents_stream(documents, metadatas, ids)
+            return "indexed"
+        
         return "skipped"
@@ -0,0 +1,130 @@
+import os
+import pickle
+import sqlite3
+import sys
+import time
+from dataclasses import fields
+from itertools import repeat
+from typing import Dict, List
+from .schema import CodeNode
+from utils.logger import logger
+
+# Bump when parser output changes so stale entries are dropped
+CACHE_VERSION = 6
+
+# Stay below SQLite's limit on bound parameters per statement
+_QUERY_BATCH = 500
+
+# Let SQLite read the database through a memory map instead of copying pages
+_MMAP_SIZE = 256 * 1024 * 1024
+
+# Entries kept by default; the least recently used ones beyond this are dropped
+MAX_ENTRIES = 100_000
+
+# file_path is not stored: entries are shared by every file with the same content
+_NODE_FIELDS = tuple(f.name for f in fields(CodeNode))
+_STORED_FIELDS = tuple(name for name in _NODE_FIELDS if name != "file_path")
+_FILE_PATH_INDEX = _NODE_FIELDS.index("file_path")
+
+# Low-cardinality string columns that repeat across every cached file;
+# interning makes all nodes share one object per distinct value
+_INTERNED_COLUMNS = tuple(_STORED_FIELDS.index(name) for name in ("type", "language", "parent_name"))
+
+
+class ParseCache:
+    """
+    SQLite cache of parsed CodeNode lists keyed by (file extension, content hash).
+    Keys are content-addressed, so old versions of a file are never overwritten;
+    instead every put keeps only the max_entries most recently used entries.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != CACHE_VERSION:
+            logger.info(f"Parse cache version changed ({version} -> {CACHE_VERSION}), clearing {db_path}")
+            self.conn.execute("DROP TABLE IF EXISTS nodes")
+            self.conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS nodes (key TEXT PRIMARY KEY, blob BLOB, last_used INTEGER NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS nodes_last_used ON nodes (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def path_for(persist_path: str) -> str:
+        return os.path.join(persist_path, "parse_cache.db")
+
+    @staticmethod
+    def make_key(file_path: str, file_hash: str) -> str:
+        # The extension picks the parser, so it is part of the key; the path is
+        # not, so renamed, moved and duplicated files reuse the same entry
+        ext = os.path.splitext(file_path)[1].lower()
+        return f"{ext}:{file_hash}"
+
+    def get_many(self, keys: Dict[str, str]) -> Dict[str, List[CodeNode]]:
+        """
+        Look up {file_path: key}. Returns {file_path: nodes} for every key that is
+        present, with each node's file_path set to the file it was requested for.
+        """
+        unique_keys = list(set(keys.values()))
+        columns = {}
+        for i in range(0, len(unique_keys), _QUERY_BATCH):
+            batch = unique_keys[i:i + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(f"SELECT key, blob FROM nodes WHERE key IN ({placeholders})", batch)
+            for key, blob in rows:
+                cols = pickle.loads(blob)
+                for col in _INTERNED_COLUMNS:
+                    cols[col] = [value if value is None else sys.intern(value) for value in cols[col]]
+                columns[key] = cols
+        self._touch(list(columns))
+        found = {}
+        for file_path, key in keys.items():
+            if key in columns:
+                cols = columns[key]
+                found[file_path] = [
+                    CodeNode(*row)
+                    for row in zip(*cols[:_FILE_PATH_INDEX], repeat(file_path), *cols[_FILE_PATH_INDEX:])
+                ]
+        return found
+
+    def put_many(self, entries: Dict[str, List[CodeNode]]) -> None:
+        """Insert or replace entries in a single transaction."""
+        if not entries:
+            return
+        # Nodes are stored column-wise (one list per CodeNode field) so field
+        # names are not repeated per node and loading skips the dict round-trip
+        now = time.time_ns()
+        rows = [
+            (key, pickle.dumps(
+                [[getattr(node, name) for node in nodes] for name in _STORED_FIELDS],
+                protocol=pickle.HIGHEST_PROTOCOL,
+            ), now)
+            for key, nodes in entries.items()
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO nodes (key, blob, last_used) VALUES (?, ?, ?)", rows)
+            self.conn.execute(
+                "DELETE FROM nodes WHERE key IN (SELECT key FROM nodes ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _touch(self, keys: List[str]) -> None:
+        """Mark keys as used now, so eviction keeps them."""
+        if not keys:
+            return
+        now = time.time_ns()
+        with self.conn:
+            for i in range(0, len(keys), _QUERY_BATCH):
+                batch = keys[i:i + _QUERY_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                self.conn.execute(f"UPDATE nodes SET last_used = ? WHERE key IN ({placeholders})", [now, *batch])
+
+    def close(self) -> None:
+        self.conn.close()
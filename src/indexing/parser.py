@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Union
 from tree_sitter import Language, Parser
 from utils.logger import logger
 from .schema import CodeNode
@@ -35,8 +35,8 @@ class CodeParser:
         cpp_parser = Parser(cpp_lang)
         self.cpp_parser = CppParser(cpp_parser, cpp_lang, 'cpp')
 
-    def parse_file(self, file_path: str, code: str) -> List[CodeNode]:
-        """Delegate parsing to the appropriate language parser."""
+    def parse_file(self, file_path: str, code: Union[str, bytes]) -> List[CodeNode]:
+        """Delegate parsing to the appropriate language parser. `code` may be text or raw UTF-8 bytes."""
         ext = os.path.splitext(file_path)[1].lower()
         
         if ext == '.py':
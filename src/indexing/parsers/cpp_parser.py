@@ -1,13 +1,23 @@
 from tree_sitter import Language, Parser, Query, QueryCursor, Node
-from typing import List, Optional, Set
+from typing import List, Optional, Set, Tuple, Union
 from ..schema import CodeNode
 
+FUNCTION_TYPES = ('function', 'function_decl')
+IDENTIFIER_TYPES = frozenset(('identifier', 'field_identifier', 'qualified_identifier', 'type_identifier'))
+
 class CppParser:
     def __init__(self, parser: Parser, language: Language, lang_type: str = 'cpp'):
         self.parser = parser
         self.language = language
         self.lang_type = lang_type  # 'c' or 'cpp'
         self._node_types = self._load_node_types()
+        # Looking children up by field id skips the name -> id lookup on every call
+        self._declarator_field = language.field_id_for_name('declarator')
+        self._definition_query = self._build_definition_query()
+        self._include_query = self._build_include_query()
+        # Cursors are reset by every captures() call, so one per query is reused for all files
+        self._definition_cursor = QueryCursor(self._definition_query) if self._definition_query else None
+        self._include_cursor = QueryCursor(self._include_query) if self._include_query else None
 
     def _load_node_types(self) -> Set[str]:
         node_types = set()
@@ -21,38 +31,50 @@ class CppParser:
     def _has_node_type(self, node_type: str) -> bool:
         return node_type in self._node_types
 
-    def parse(self, code: str, file_path: str) -> List[CodeNode]:
-        tree = self.parser.parse(bytes(code, "utf8"))
-        nodes = []
-        
-        # 1. Extract Includes
-        includes = self._extract_includes(tree.root_node, code)
-        
-        # 2. Define Query
-        query_parts = []
+    def _build_definition_query(self) -> Optional[Query]:
+        parts = []
         if self._has_node_type("function_definition"):
-            query_parts.append("(function_definition) @function")
+            parts.append("(function_definition) @function")
         if self._has_node_type("struct_specifier"):
-            query_parts.append("(struct_specifier) @struct")
+            parts.append("(struct_specifier) @struct")
         if self._has_node_type("enum_specifier"):
-            query_parts.append("(enum_specifier) @enum")
+            parts.append("(enum_specifier) @enum")
         if self._has_node_type("type_definition"):
-            query_parts.append("(type_definition) @typedef")
+            parts.append("(type_definition) @typedef")
         if self._has_node_type("preproc_def"):
-            query_parts.append("(preproc_def) @macro")
+            parts.append("(preproc_def) @macro")
         if self._has_node_type("preproc_function_def"):
-            query_parts.append("(preproc_function_def) @macro")
+            parts.append("(preproc_function_def) @macro")
         if self._has_node_type("declaration"):
-            query_parts.append("(declaration) @declaration")
+            parts.append("(declaration) @declaration")
         if self.lang_type == 'cpp' and self._has_node_type("class_specifier"):
-            query_parts.append("(class_specifier) @class")
+            parts.append("(class_specifier) @class")
+        if not parts:
+            return None
+        return Query(self.language, "\n".join(parts))
 
-        if not query_parts:
-            return nodes
+    def _build_include_query(self) -> Optional[Query]:
+        if not self._has_node_type("preproc_include"):
+            return None
+        return Query(self.language, "(preproc_include) @include")
 
-        query = Query(self.language, "\n".join(query_parts))
-        cursor = QueryCursor(query)
-        captures = cursor.captures(tree.root_node)
+    def parse(self, code: Union[str, bytes], file_path: str) -> List[CodeNode]:
+        # Work on UTF-8 bytes throughout: tree-sitter offsets are byte offsets,
+        # so text is sliced from the bytes and only the slices are decoded
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+        tree = self.parser.parse(code)
+        # Slicing a memoryview copies nothing; text is decoded straight from the buffer
+        code = memoryview(code)
+        nodes = []
+        
+        # 1. Extract Includes
+        includes = self._extract_includes(tree.root_node, code)
+        
+        # 2. Extract Definitions
+        if not self._definition_cursor:
+            return nodes
+        captures = self._definition_cursor.captures(tree.root_node)
         
         capture_list = []
         for node, name in self._iter_captures(captures):
@@ -72,21 +94,24 @@ class CppParser:
             if capture_type in ['struct', 'class'] and self._is_anonymous_type(node, code):
                 continue
 
+            if capture_type == 'declaration' and not self._is_top_level(node):
+                continue
+
+            # Walk the declarator chain once; name, return type and arguments all come from it
+            function_declarator = name_node = last_declarator = None
+            if capture_type in ('function', 'declaration', 'typedef'):
+                function_declarator, name_node, last_declarator = self._walk_declarator(node)
+
             if capture_type == 'declaration':
-                if not self._is_top_level(node):
-                    continue
-                if self._is_function_declaration(node):
-                    capture_type = 'function_decl'
-                else:
-                    capture_type = 'global_var'
+                capture_type = 'function_decl' if function_declarator else 'global_var'
 
             # Resolve complex names (pointers, namespaces)
-            name = self._resolve_name(node, code, capture_type)
+            name = self._resolve_name(node, code, capture_type, name_node, last_declarator)
             docstring = self._extract_docstring(node, code) if capture_type in ['function', 'function_decl', 'struct', 'class', 'enum', 'typedef'] else None
-            signature = self._extract_signature(node, code, capture_type) if capture_type in ['function', 'function_decl'] else None
-            return_type = self._extract_return_type(node, code, capture_type) if capture_type in ['function', 'function_decl'] else None
-            arguments = self._extract_arguments(node, code) if capture_type in ['function', 'function_decl'] else []
-            parent_name = self._extract_parent_name(node, name, code, capture_type) if capture_type in ['function', 'function_decl'] else None
+            signature = self._extract_signature(node, code, capture_type) if capture_type in FUNCTION_TYPES else None
+            return_type = self._extract_return_type(node, code, capture_type, name_node) if capture_type in FUNCTION_TYPES else None
+            arguments = self._extract_arguments(function_declarator, code) if capture_type in FUNCTION_TYPES else []
+            parent_name = self._extract_parent_name(node, name, code, capture_type) if capture_type in FUNCTION_TYPES else None
             
             code_node = CodeNode(
                 type=capture_type,
@@ -107,20 +132,18 @@ class CppParser:
             
         return nodes
 
-    def _extract_includes(self, root: Node, code: str) -> List[str]:
+    def _extract_includes(self, root: Node, code: memoryview) -> List[str]:
         includes = []
-        if not self._has_node_type("preproc_include"):
+        if not self._include_cursor:
             return includes
-        query = Query(self.language, "(preproc_include) @include")
-        cursor = QueryCursor(query)
-        captures = cursor.captures(root)
+        captures = self._include_cursor.captures(root)
         for node, _ in self._iter_captures(captures):
             text = self._get_text(node, code).strip()
             if text and text not in includes:
                 includes.append(text)
         return includes
 
-    def _extract_docstring(self, node: Node, code: str) -> Optional[str]:
+    def _extract_docstring(self, node: Node, code: memoryview) -> Optional[str]:
         # C/C++ often uses comments right above the function
         comments = []
         prev = node.prev_sibling
@@ -134,36 +157,38 @@ class CppParser:
                 break
         return "\n".join(comments) if comments else None
 
-    def _resolve_name(self, node: Node, code: str, capture_type: str) -> str:
+    def _walk_declarator(self, node: Node) -> Tuple[Optional[Node], Optional[Node], Optional[Node]]:
+        """
+        Single pass down the 'declarator' chain (pointers, references, function declarators).
+        Returns: (first function_declarator, identifier node, last declarator visited)
+        """
+        function_declarator = None
+        declarator_field = self._declarator_field
+        decl = node.child_by_field_id(declarator_field)
+        while decl:
+            decl_type = decl.type
+            if decl_type in IDENTIFIER_TYPES:
+                return function_declarator, decl, decl
+            if decl_type == 'function_declarator' and function_declarator is None:
+                function_declarator = decl
+            next_decl = decl.child_by_field_id(declarator_field)
+            if not next_decl:
+                break
+            decl = next_decl
+        return function_declarator, None, decl
+
+    def _resolve_name(self, node: Node, code: memoryview, capture_type: str,
+                      name_node: Optional[Node], last_declarator: Optional[Node]) -> str:
         # Handle declarators, pointers, references, etc.
-        if capture_type in ['function', 'function_decl'] or node.type == 'function_definition':
-            decl = node.child_by_field_name('declarator')
-            while decl:
-                if decl.type == 'function_declarator':
-                    decl = decl.child_by_field_name('declarator')
-                elif decl.type in ['pointer_declarator', 'reference_declarator']:
-                    decl = decl.child_by_field_name('declarator')
-                elif decl.type in ['identifier', 'field_identifier', 'qualified_identifier', 'type_identifier']:
-                    return self._get_text(decl, code)
-                else:
-                    # Fallback or deeper nesting
-                    if not decl.child_by_field_name('declarator'):
-                         # Try to find identifier in children
-                         for child in decl.children:
-                             if child.type == 'identifier':
-                                 return self._get_text(child, code)
-                    break
+        if capture_type in ['function', 'function_decl', 'global_var', 'typedef']:
+            if name_node:
+                return self._get_text(name_node, code)
+            if capture_type in FUNCTION_TYPES and last_declarator:
+                # e.g. destructor_name: the identifier is a plain child
+                for child in last_declarator.children:
+                    if child.type == 'identifier':
+                        return self._get_text(child, code)
 
-        if capture_type in ['global_var', 'typedef']:
-            decl = node.child_by_field_name('declarator')
-            while decl:
-                if decl.type in ['identifier', 'field_identifier', 'qualified_identifier', 'type_identifier']:
-                    return self._get_text(decl, code)
-                next_decl = decl.child_by_field_name('declarator')
-                if not next_decl:
-                    break
-                decl = next_decl
-        
         # Struct/Class name
         name_node = node.child_by_field_name('name')
         if name_node:
@@ -174,7 +199,7 @@ class CppParser:
             
         return "anonymous"
 
-    def _extract_parent_name(self, node: Node, name: str, code: str, capture_type: str) -> Optional[str]:
+    def _extract_parent_name(self, node: Node, name: str, code: memoryview, capture_type: str) -> Optional[str]:
         if capture_type not in ['function', 'function_decl']:
             return None
         if "::" in name:
@@ -189,49 +214,29 @@ class CppParser:
             parent = parent.parent
         return None
 
-    def _extract_signature(self, node: Node, code: str, capture_type: str) -> Optional[str]:
+    def _extract_signature(self, node: Node, code: memoryview, capture_type: str) -> Optional[str]:
         if capture_type == 'function':
             body = node.child_by_field_name('body')
             if body:
-                return code[node.start_byte:body.start_byte].strip()
+                return self._decode_span(code, node.start_byte, body.start_byte).strip()
         if capture_type == 'function_decl':
             text = self._get_text(node, code).strip()
             return text.rstrip(';').strip()
         return None
 
-    def _extract_return_type(self, node: Node, code: str, capture_type: str) -> Optional[str]:
-        if capture_type in ['function', 'function_decl']:
-            name_node = self._find_declarator_name_node(node)
-            if name_node:
-                return code[node.start_byte:name_node.start_byte].strip()
+    def _extract_return_type(self, node: Node, code: memoryview, capture_type: str, name_node: Optional[Node]) -> Optional[str]:
+        if capture_type in FUNCTION_TYPES and name_node:
+            return self._decode_span(code, node.start_byte, name_node.start_byte).strip()
         type_node = node.child_by_field_name('type')
         if type_node:
             return self._get_text(type_node, code).strip()
         return None
 
-    def _find_declarator_name_node(self, node: Node) -> Optional[Node]:
-        decl = node.child_by_field_name('declarator')
-        while decl:
-            if decl.type == 'function_declarator':
-                decl = decl.child_by_field_name('declarator')
-                continue
-            if decl.type in ['pointer_declarator', 'reference_declarator']:
-                decl = decl.child_by_field_name('declarator')
-                continue
-            if decl.type in ['identifier', 'field_identifier', 'qualified_identifier', 'type_identifier']:
-                return decl
-            next_decl = decl.child_by_field_name('declarator')
-            if not next_decl:
-                break
-            decl = next_decl
-        return None
-
-    def _extract_arguments(self, node: Node, code: str) -> List[str]:
+    def _extract_arguments(self, function_declarator: Optional[Node], code: memoryview) -> List[str]:
         params = []
-        declarator = self._find_function_declarator(node)
-        if not declarator:
+        if not function_declarator:
             return params
-        param_list = declarator.child_by_field_name('parameters')
+        param_list = function_declarator.child_by_field_name('parameters')
         if not param_list:
             return params
         for child in param_list.children:
@@ -239,26 +244,16 @@ class CppParser:
                 params.append(self._get_text(child, code).strip())
         return params
 
-    def _find_function_declarator(self, node: Node) -> Optional[Node]:
-        decl = node.child_by_field_name('declarator')
-        while decl:
-            if decl.type == 'function_declarator':
-                return decl
-            next_decl = decl.child_by_field_name('declarator')
-            if not next_decl:
-                break
-            decl = next_decl
-        return None
-
-    def _is_function_declaration(self, node: Node) -> bool:
-        return self._find_function_declarator(node) is not None
-
     def _is_top_level(self, node: Node) -> bool:
         return node.parent is not None and node.parent.type == 'translation_unit'
 
-    def _extract_macro_name(self, node: Node, code: str) -> str:
-        text = self._get_text(node, code).strip()
-        parts = text.split()
+    def _extract_macro_name(self, node: Node, code: memoryview) -> str:
+        # preproc_def / preproc_function_def expose the macro name as a field
+        name_node = node.child_by_field_name('name')
+        if name_node:
+            return self._get_text(name_node, code)
+        # Only the first two tokens are needed, don't split the whole body
+        parts = self._get_text(node, code).split(None, 2)
         if len(parts) >= 2:
             return parts[1]
         return "macro"
@@ -272,14 +267,17 @@ class CppParser:
                 return True
         return False
 
-    def _is_anonymous_type(self, node: Node, code: str) -> bool:
+    def _is_anonymous_type(self, node: Node, code: memoryview) -> bool:
         name_node = node.child_by_field_name('name')
         return name_node is None or self._get_text(name_node, code).strip() == ""
 
-    def _get_text(self, node: Node, code: str) -> str:
+    def _get_text(self, node: Node, code: memoryview) -> str:
         if not node:
             return ""
-        return code[node.start_byte:node.end_byte]
+        return self._decode_span(code, node.start_byte, node.end_byte)
+
+    def _decode_span(self, code: memoryview, start: int, end: int) -> str:
+        return str(code[start:end], "utf-8", "replace")
 
     def _iter_captures(self, captures):
         if isinstance(captures, dict):
@@ -1,5 +1,5 @@
 from tree_sitter import Language, Parser, Query, QueryCursor, Node
-from typing import List, Optional, Set
+from typing import List, Optional, Set, Union
 from ..schema import CodeNode
 
 class PythonParser:
@@ -9,6 +9,9 @@ class PythonParser:
         self._node_types = self._load_node_types()
         self._definition_query = self._build_definition_query()
         self._import_query = self._build_import_query()
+        # Cursors are reset by every captures() call, so one per query is reused for all files
+        self._definition_cursor = QueryCursor(self._definition_query) if self._definition_query else None
+        self._import_cursor = QueryCursor(self._import_query) if self._import_query else None
 
     def _load_node_types(self) -> Set[str]:
         node_types = set()
@@ -53,18 +56,23 @@ class PythonParser:
             return None
         return Query(self.language, "\n".join(parts))
 
-    def parse(self, code: str, file_path: str) -> List[CodeNode]:
-        tree = self.parser.parse(bytes(code, "utf8"))
+    def parse(self, code: Union[str, bytes], file_path: str) -> List[CodeNode]:
+        # Work on UTF-8 bytes throughout: tree-sitter offsets are byte offsets,
+        # so text is sliced from the bytes and only the slices are decoded
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+        tree = self.parser.parse(code)
+        # Slicing a memoryview copies nothing; text is decoded straight from the buffer
+        code = memoryview(code)
         nodes = []
         
         # 1. Extract File-level Imports
         file_imports = self._extract_imports(tree.root_node, code)
         
         # 2. Extract Definitions
-        if not self._definition_query:
+        if not self._definition_cursor:
             return nodes
-        cursor = QueryCursor(self._definition_query)
-        captures = cursor.captures(tree.root_node)
+        captures = self._definition_cursor.captures(tree.root_node)
         
         capture_list = []
         for node, name in self._iter_captures(captures):
@@ -134,17 +142,16 @@ class PythonParser:
             for node, name in captures:
                 yield node, name
 
-    def _extract_imports(self, root: Node, code: str) -> List[str]:
+    def _extract_imports(self, root: Node, code: memoryview) -> List[str]:
         imports = []
-        if not self._import_query:
+        if not self._import_cursor:
             return imports
-        cursor = QueryCursor(self._import_query)
-        captures = cursor.captures(root)
+        captures = self._import_cursor.captures(root)
         for node, _ in self._iter_captures(captures):
             imports.append(self._get_text(node, code))
         return imports
 
-    def _extract_docstring(self, node: Node, code: str) -> Optional[str]:
+    def _extract_docstring(self, node: Node, code: memoryview) -> Optional[str]:
         body = node.child_by_field_name('body')
         if not body:
             return None
@@ -163,13 +170,13 @@ class PythonParser:
                 break
         return None
 
-    def _extract_return_type(self, node: Node, code: str) -> Optional[str]:
+    def _extract_return_type(self, node: Node, code: memoryview) -> Optional[str]:
         return_type = node.child_by_field_name('return_type')
         if return_type:
             return self._get_text(return_type, code)
         return None
 
-    def _extract_arguments(self, node: Node, code: str) -> List[str]:
+    def _extract_arguments(self, node: Node, code: memoryview) -> List[str]:
         params = node.child_by_field_name('parameters')
         if not params:
             return []
@@ -182,16 +189,16 @@ class PythonParser:
                 args.append(self._get_text(child, code))
         return args
 
-    def _extract_signature(self, node: Node, capture_type: str, code: str) -> Optional[str]:
+    def _extract_signature(self, node: Node, capture_type: str, code: memoryview) -> Optional[str]:
         if capture_type != 'function':
             return None
         body = node.child_by_field_name('body')
         if not body:
             return None
-        signature = code[node.start_byte:body.start_byte].strip()
+        signature = self._decode_span(code, node.start_byte, body.start_byte).strip()
         return signature.rstrip(':').strip()
 
-    def _get_node_name(self, node: Node, capture_type: str, code: str) -> str:
+    def _get_node_name(self, node: Node, capture_type: str, code: memoryview) -> str:
         if capture_type in ['function', 'class']:
             return self._get_text(node.child_by_field_name('name'), code)
         if capture_type == 'assignment':
@@ -202,16 +209,20 @@ class PythonParser:
                     return found
         return ""
 
-    def _first_identifier_in(self, node: Node, code: str) -> str:
-        if node.type == 'identifier':
-            return self._get_text(node, code)
-        for child in node.children:
-            found = self._first_identifier_in(child, code)
-            if found:
-                return found
-        return ""
+    def _first_identifier_in(self, node: Node, code: memoryview) -> str:
+        # Pre-order walk with a TreeCursor, which moves in C without
+        # materializing a children list for every visited node
+        cursor = node.walk()
+        while True:
+            if cursor.node.type == 'identifier':
+                return self._get_text(cursor.node, code)
+            if cursor.goto_first_child():
+                continue
+            while not cursor.goto_next_sibling():
+                if not cursor.goto_parent():
+                    return ""
 
-    def _find_parent_class(self, node: Node, code: str) -> Optional[str]:
+    def _find_parent_class(self, node: Node, code: memoryview) -> Optional[str]:
         parent = node.parent
         while parent:
             if parent.type == 'class_definition':
@@ -220,7 +231,10 @@ class PythonParser:
             parent = parent.parent
         return None
 
-    def _get_text(self, node: Node, code: str) -> str:
+    def _get_text(self, node: Node, code: memoryview) -> str:
         if not node:
             return ""
-        return code[node.start_byte:node.end_byte]
+        return self._decode_span(code, node.start_byte, node.end_byte)
+
+    def _decode_span(self, code: memoryview, start: int, end: int) -> str:
+        return str(code[start:end], "utf-8", "replace")
@@ -0,0 +1,35 @@
+import os
+from typing import Iterable, Iterator
+from utils.logger import logger
+
+# Directory names that never contain project sources worth indexing
+EXCLUDED_DIRS = frozenset(['build', 'venv', '__pycache__', 'node_modules', 'dist'])
+
+
+def _is_excluded_dir(name: str) -> bool:
+    return name.startswith('.') or name in EXCLUDED_DIRS or name.endswith('.egg-info')
+
+
+def iter_source_files(root_path: str, extensions: Iterable[str]) -> Iterator[str]:
+    """
+    Yield paths of files under root_path whose extension is in extensions.
+    Excluded directories are pruned before descending, so large ignored
+    trees (.git, build outputs, virtualenvs) are never listed.
+    """
+    exts = frozenset(ext.lower() for ext in extensions)
+    stack = [root_path]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _is_excluded_dir(entry.name):
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = entry.name
+                        dot = name.rfind('.')
+                        if dot > 0 and name[dot:].lower() in exts:
+                            yield entry.path
+        except OSError as e:
+            logger.warning(f"Cannot scan directory {directory}: {e}")
@@ -9,7 +9,7 @@ from typing import List, Optional, Dict, Any
 # - Full list of imports/dependencies
 # This will improve answers for "What does this file do?" type queries.
 
-@dataclass
+@dataclass(slots=True)
 class CodeNode:
     """Source code entity representation for indexing."""
     
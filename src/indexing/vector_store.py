@@ -2,17 +2,37 @@ import sys
 import chromadb
 from chromadb.utils import embedding_functions
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from utils.logger import logger
-from config import config
+from config import get_config
+
+# Embedding functions shared by every VectorStore in the process, keyed by
+# (provider, model, Ollama URL); building one can load a local ONNX model
+_EF_CACHE: Dict[tuple, Any] = {}
+
+# Collection handles already opened in this process, keyed by
+# (absolute persist path, collection name), with the embedding function they use
+_COLLECTION_CACHE: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
 
 class VectorStore:
     def __init__(self, collection_name="code_chunks", persist_path="./db"):
         logger.info(f"Initializing vector store at {persist_path}")
+        self.persist_path = persist_path
+        # Documents are buffered and embedded in batches of this size
+        self.batch_size = get_config().embed_batch
+        self._buf_docs: List[str] = []
+        self._buf_meta: List[Dict[str, Any]] = []
+        self._buf_ids: List[str] = []
         self.client = chromadb.PersistentClient(path=persist_path)
         
         # Get embedding function based on configuration
         self.ef = self._get_embedding_function()
+
+        cache_key = (os.path.abspath(persist_path), collection_name)
+        cached = _COLLECTION_CACHE.get(cache_key)
+        if cached is not None and cached[0] is self.ef:
+            self.collection = cached[1]
+            return
         
         # Try to get or create collection, handle embedding function conflicts
         try:
@@ -35,9 +55,19 @@ class VectorStore:
                     raise
             else:
                 raise
+        _COLLECTION_CACHE[cache_key] = (self.ef, self.collection)
     
     def _get_embedding_function(self):
-        """Get embedding function based on EMBEDDING_PROVIDER configuration."""
+        """Get the shared embedding function for the current configuration."""
+        config = get_config()
+        key = (config.embedding_provider, config.embedding_model, config.ollama_base_url)
+        ef = _EF_CACHE.get(key)
+        if ef is None:
+            ef = _EF_CACHE[key] = self._build_embedding_function(config)
+        return ef
+
+    def _build_embedding_function(self, config):
+        """Build an embedding function based on EMBEDDING_PROVIDER configuration."""
         provider = config.embedding_provider
         
         if provider == "openai":
@@ -57,21 +87,13 @@ class VectorStore:
         
         elif provider == "ollama":
             logger.info(f"Using Ollama Embeddings ({config.embedding_model} at {config.ollama_base_url})")
-            try:
-                # Ollama uses OpenAI-compatible API
-                import chromadb.utils.embedding_functions as ef
-                return ef.OllamaEmbeddingFunction(
-                    url=f"{config.ollama_base_url}/api/embeddings",
-                    model_name=config.embedding_model
-                )
-            except AttributeError:
-                # Fallback: use custom implementation if ChromaDB doesn't have OllamaEmbeddingFunction
-                logger.warning("ChromaDB doesn't have built-in Ollama support. Using custom implementation.")
-                from utils.ollama_embedding import OllamaEmbeddingFunction
-                return OllamaEmbeddingFunction(
-                    base_url=config.ollama_base_url,
-                    model_name=config.embedding_model
-                )
+            # The custom function embeds each batch in one /api/embed request;
+            # ChromaDB's built-in one posts every document separately
+            from utils.ollama_embedding import OllamaEmbeddingFunction
+            return OllamaEmbeddingFunction(
+                base_url=config.ollama_base_url,
+                model_name=config.embedding_model
+            )
         
         elif provider == "default":
             logger.info("Using default embeddings (Sentence Transformers)")
@@ -83,10 +105,51 @@ class VectorStore:
             raise ValueError(f"Unknown EMBEDDING_PROVIDER: {provider}")
 
     def add_documents(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        """Add documents to the collection, embedding them in batches of batch_size."""
         if not documents:
             logger.debug("No documents to add")
             return
         
+        # Documents queued by add_documents_stream go first
+        self.flush()
+        for i in range(0, len(documents), self.batch_size):
+            end = i + self.batch_size
+            self._add(documents[i:end], metadatas[i:end], ids[i:end])
+
+    def add_documents_stream(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        """
+        Queue documents for insertion, accumulating across calls. Full batches
+        are written right away; the remainder stays buffered until flush() or
+        close() (or the next add_documents/query/delete).
+        """
+        self._buf_docs.extend(documents)
+        self._buf_meta.extend(metadatas)
+        self._buf_ids.extend(ids)
+        while len(self._buf_docs) >= self.batch_size:
+            self._write_batch(self.batch_size)
+
+    def flush(self):
+        """Write all buffered documents to the collection."""
+        while self._buf_docs:
+            self._write_batch(self.batch_size)
+
+    def close(self):
+        """Write any buffered documents; the store is not used after this."""
+        self.flush()
+
+    def __enter__(self) -> "VectorStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_batch(self, size: int):
+        documents, self._buf_docs = self._buf_docs[:size], self._buf_docs[size:]
+        metadatas, self._buf_meta = self._buf_meta[:size], self._buf_meta[size:]
+        ids, self._buf_ids = self._buf_ids[:size], self._buf_ids[size:]
+        self._add(documents, metadatas, ids)
+
+    def _add(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
         try:
             self.collection.add(
                 documents=documents,
@@ -98,14 +161,36 @@ class VectorStore:
             logger.error(f"Failed to add documents to vector store: {type(e).__name__}: {e}")
             raise
 
-    def query(self, query_text: str, n_results: int = 5):
+    def delete_by_file(self, file_path: str):
+        """Remove every document that was indexed from the given file."""
+        self.flush()
+        try:
+            self.collection.delete(where={"file_path": file_path})
+            logger.debug(f"Deleted documents for {file_path}")
+        except Exception as e:
+            logger.error(f"Failed to delete documents for {file_path}: {type(e).__name__}: {e}")
+            raise
+
+    def count(self) -> int:
+        """Number of documents stored in the collection."""
+        self.flush()
+        return self.collection.count()
+
+    def query(self, query_text: str, n_results: int = 5, include: Optional[List[str]] = None):
+        """
+        include: result fields to fetch (e.g. ["metadatas", "distances"]);
+        defaults to ChromaDB's documents, metadatas and distances.
+        """
+        self.flush()
         try:
             logger.debug(f"Querying vector store: '{query_text[:50]}...' (n_results={n_results})")
+            kwargs = {"include": include} if include is not None else {}
             results = self.collection.query(
                 query_texts=[query_text],
-                n_results=n_results
+                n_results=n_results,
+                **kwargs
             )
-            found = len(results['documents'][0]) if results['documents'] else 0
+            found = len(results['ids'][0]) if results['ids'] else 0
             logger.debug(f"Found {found} results")
             return results
         except Exception as e:
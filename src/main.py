@@ -1,40 +1,53 @@
 import sys
 import os
 import argparse
+from typing import Optional
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config import config
 from indexing.indexer import CodeIndexer
 from indexing.vector_store import VectorStore
 from agent.core import CodeAgent
 
-def index_project(project_path: str):
+def index_project(project_path: str, workers: Optional[int] = None):
     if not os.path.exists(project_path):
         print(f"Error: Path {project_path} does not exist.")
         return
-    indexer = CodeIndexer(project_path)
+    indexer = CodeIndexer(project_path, workers=workers)
     indexer.index_project()
 
 def search_code(query: str):
     store = VectorStore()
-    results = store.query(query)
+    # Snippets are stored in the metadata, so the full documents are not fetched
+    results = store.query(query, include=["metadatas", "distances"])
     
     print(f"\nSearch results for: '{query}'\n")
     
     # ChromaDB query results structure:
-    # {'ids': [...], 'distances': [...], 'metadatas': [...], 'documents': [...]}
+    # {'ids': [...], 'distances': [...], 'metadatas': [...], 'documents': None}
     
-    if not results['documents'] or not results['documents'][0]:
+    if not results['metadatas'] or not results['metadatas'][0]:
         print("No results found.")
         return
 
-    for i, doc in enumerate(results['documents'][0]):
-        meta = results['metadatas'][0][i]
-        print(f"--- Result {i+1} ({meta['file_path']}:{meta['start_line']}) ---")
+    metadatas = results['metadatas'][0]
+    documents = None
+    if any('snippet' not in meta for meta in metadatas):
+        # Indexed before snippets were stored; fall back to the documents
+        results = store.query(query)
+        metadatas = results['metadatas'][0]
+        documents = results['documents'][0]
+
+    for i, meta in enumerate(metadatas):
+        distance = results['distances'][0][i]
+        print(f"--- Result {i+1} ({meta['file_path']}:{meta['start_line']}) [distance: {distance:.3f}] ---")
         print(f"Type: {meta['type']}, Name: {meta['name']}")
-        print(doc[:200] + "..." if len(doc) > 200 else doc)
+        if documents is not None:
+            doc = documents[i]
+            print(doc[:200] + "..." if len(doc) > 200 else doc)
+        else:
+            print(meta['snippet'])
         print("\n")
 
 def start_chat():
@@ -47,10 +60,12 @@ def start_chat():
                 break
             
             try:
-                response = agent.chat(user_input)
-                print(f"\nAgent: {response}")
+                print("\nAgent: ", end="", flush=True)
+                for text in agent.chat_stream(user_input):
+                    print(text, end="", flush=True)
+                print()
             except Exception as e:
-                print(f"Error during chat: {e}")
+                print(f"\nError during chat: {e}")
                 
     except ValueError as e:
         print(f"Configuration Error: {e}")
@@ -64,6 +79,8 @@ def main():
     # Index command
     index_parser = subparsers.add_parser("index", help="Index a project")
     index_parser.add_argument("path", help="Path to the project to index")
+    index_parser.add_argument("-j", "--workers", type=int, default=None,
+                              help="Number of parser processes (default: number of CPU cores)")
 
     # Search command
     search_parser = subparsers.add_parser("search", help="Search the indexed code")
@@ -75,7 +92,7 @@ def main():
     args = parser.parse_args()
 
     if args.command == "index":
-        index_project(args.path)
+        index_project(args.path, workers=args.workers)
     elif args.command == "search":
         search_code(args.query)
     elif args.command == "chat":
@@ -1,9 +1,18 @@
-from typing import List, Dict, Any
+import io
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Tuple
 from indexing.vector_store import VectorStore
 
 class SearchTool:
-    def __init__(self):
+    def __init__(self, max_chars: int = 20000, cache_size: int = 128):
         self.vector_store = VectorStore()
+        # Upper bound on the text returned to the model per search
+        self.max_chars = max_chars
+        # LRU of formatted results; the index does not change during a session
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def search_codebase(self, query: str, n_results: int = 5) -> str:
         """
@@ -16,15 +25,31 @@ class SearchTool:
         Returns:
             str: A formatted string containing the search results.
         """
+        key = (query, n_results)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        output = self._search(query, n_results)
+
+        with self._cache_lock:
+            self._cache[key] = output
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return output
+
+    def _search(self, query: str, n_results: int) -> str:
         results = self.vector_store.query(query, n_results)
         
         if not results['documents'] or not results['documents'][0]:
             return "No relevant code found."
 
-        formatted_results = []
+        buf = io.StringIO()
+        used = 0
         for i, doc in enumerate(results['documents'][0]):
             meta = results['metadatas'][0][i]
-            formatted_results.append(
+            block = (
                 f"Result {i+1}:\n"
                 f"File: {meta['file_path']}\n"
                 f"Type: {meta['type']}\n"
@@ -32,8 +57,16 @@ class SearchTool:
                 f"Line: {meta['start_line']}-{meta['end_line']}\n"
                 f"Content:\n{doc}\n"
             )
+            # Always return the best match, then stop once the budget is used up
+            if used and used + len(block) + 1 > self.max_chars:
+                break
+            if used:
+                buf.write("\n")
+                used += 1
+            buf.write(block)
+            used += len(block)
             
-        return "\n".join(formatted_results)
+        return buf.getvalue()
 
     def get_tool_definition(self) -> Dict[str, Any]:
         return {
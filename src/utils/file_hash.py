@@ -0,0 +1,119 @@
+"""
+File hashing helpers used for index change detection.
+
+The hash is only a content fingerprint, not a security boundary, so the
+fastest available algorithm is used: BLAKE3 when the optional `blake3`
+package is installed, BLAKE2b (160-bit digest) from hashlib otherwise.
+"""
+import hashlib
+import mmap
+import os
+import subprocess
+from typing import Dict, Optional
+
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Stored alongside the hashes so that switching algorithms invalidates them
+HASH_ALGORITHM = "blake3" if blake3 is not None else "blake2b-160"
+
+# Recorded instead of HASH_ALGORITHM inside a git work tree, where every hash
+# is a git blob id (see git_blob_hashes and git_blob_hash)
+GIT_HASH_ALGORITHM = "git-blob-sha1"
+
+
+def _blake2b():
+    # 20-byte digest keeps hashes as wide as the SHA-1 ones used before
+    return hashlib.blake2b(digest_size=20)
+
+
+def content_hash(path: str) -> str:
+    """Return the hex digest of a file's content using HASH_ALGORITHM."""
+    with open(path, 'rb') as f:
+        if blake3 is not None:
+            if os.fstat(f.fileno()).st_size == 0:
+                return blake3.blake3().hexdigest()
+            # mmap lets BLAKE3 hash the page cache directly without copying
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return blake3.blake3(mm).hexdigest()
+        return _digest_file(f, _blake2b()).hexdigest()
+
+
+def git_blob_hash(path: str) -> str:
+    """
+    Return "git:<sha>" with the id git gives the file's content as a blob, so
+    a file hashes the same whether or not git_blob_hashes reports it.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        return "git:" + _digest_file(f, hashlib.sha1(b"blob %d\0" % size)).hexdigest()
+
+
+def hash_bytes(data: bytes, git_blob: bool = False) -> str:
+    """Hash content already in memory like content_hash, or like git_blob_hash when git_blob is set."""
+    if git_blob:
+        return "git:" + hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest()
+    h = _blake2b()
+    h.update(data)
+    return h.hexdigest()
+
+
+def _digest_file(f, h):
+    """Feed the rest of the open file f into hash object h and return it."""
+    if hasattr(hashlib, 'file_digest'):
+        # Python 3.11+: reads into a reusable buffer in C
+        return hashlib.file_digest(f, lambda: h)
+    # Python 3.10: same idea in Python, one buffer reused for every chunk
+    buf = bytearray(_CHUNK_SIZE)
+    view = memoryview(buf)
+    while True:
+        n = f.readinto(buf)
+        if not n:
+            break
+        h.update(view[:n])
+    return h
+
+
+def _git_ls_files(root_path: str, *args: str) -> bytes:
+    result = subprocess.run(
+        ["git", "-C", root_path, "ls-files", "-z", *args],
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout
+
+
+def git_blob_hashes(root_path: str) -> Optional[Dict[str, str]]:
+    """
+    Return {rel_path: "git:<blob sha>"} for files git tracks and that have no
+    unstaged changes. Git already hashed these, so they need not be read again.
+    Returns None when root_path is not inside a git work tree.
+    """
+    try:
+        staged = _git_ls_files(root_path, "--stage")
+        modified = _git_ls_files(root_path, "--modified")
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    # Modified (or deleted) files: the index blob no longer matches the work tree
+    skip = set(modified.split(b"\0"))
+    hashes = {}
+    # Records look like "<mode> <sha> <stage>\t<path>"
+    for record in staged.split(b"\0"):
+        if not record:
+            continue
+        info, _, path = record.partition(b"\t")
+        _, sha, stage = info.split(b" ")
+        if stage != b"0" or path in skip:
+            continue
+        rel_path = os.fsdecode(path)
+        if os.sep != "/":
+            rel_path = rel_path.replace("/", os.sep)
+        hashes[rel_path] = "git:" + sha.decode("ascii")
+    return hashes
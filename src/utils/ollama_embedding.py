@@ -1,39 +1,97 @@
 """
 Custom Ollama Embedding Function for ChromaDB
 """
-import requests
+import httpx
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from chromadb.api.types import Documents, Embeddings
 import chromadb.utils.embedding_functions as embedding_functions
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Concurrent single-prompt requests used when the server lacks /api/embed
+_FALLBACK_WORKERS = 8
+
 
 class OllamaEmbeddingFunction(embedding_functions.EmbeddingFunction[Documents]):
     """Custom embedding function for Ollama."""
-    
+
     def __init__(self, base_url: str = "http://localhost:11434", model_name: str = "mxbai-embed-large"):
         self.base_url = base_url.rstrip('/')
         self.model_name = model_name
-        self.embed_url = f"{self.base_url}/api/embeddings"
-    
+        self.embed_url = "/api/embeddings"
+        self.batch_url = "/api/embed"
+        # Cleared once the server turns out not to support /api/embed
+        self._batch_supported = True
+        # One pooled keep-alive client for every request (HTTP/2 when h2 is installed)
+        self.client = httpx.Client(
+            base_url=self.base_url,
+            http2=_HTTP2,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=_FALLBACK_WORKERS),
+        )
+
     def __call__(self, input: Documents) -> Embeddings:
-        """Generate embeddings for the input documents."""
-        embeddings = []
-        
-        for text in input:
-            response = requests.post(
-                self.embed_url,
-                json={
-                    "model": self.model_name,
-                    "prompt": text
-                }
+        """Generate embeddings for the input documents in a single batch request."""
+        texts = list(input)
+        if not texts:
+            return []
+
+        if not self._batch_supported:
+            return self._embed_each(texts)
+
+        response = self.client.post(
+            self.batch_url,
+            json={
+                "model": self.model_name,
+                "input": texts
+            }
+        )
+
+        # Servers older than the batch endpoint answer 404 (or 400 for the unknown field)
+        if response.status_code in (400, 404):
+            self._batch_supported = False
+            return self._embed_each(texts)
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama embedding request failed: {response.status_code} - {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise RuntimeError(
-                    f"Ollama embedding request failed: {response.status_code} - {response.text}"
-                )
-            
-            result = response.json()
-            embeddings.append(result["embedding"])
-        
-        return embeddings
+
+        return response.json()["embeddings"]
+
+    def _embed_each(self, texts: List[str]) -> Embeddings:
+        """Embed documents one request each, concurrently, through /api/embeddings."""
+        with ThreadPoolExecutor(max_workers=min(_FALLBACK_WORKERS, len(texts))) as executor:
+            return list(executor.map(self._embed_one, texts))
+
+    def _embed_one(self, text: str) -> List[float]:
+        """Embed a single document through the legacy /api/embeddings endpoint."""
+        response = self.client.post(
+            self.embed_url,
+            json={
+                "model": self.model_name,
+                "prompt": text
+            }
+        )
+
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Ollama embedding request failed: {response.status_code} - {response.text}"
+            )
+
+        return response.json()["embedding"]
+
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self.client.close()
+
+    def __enter__(self) -> "OllamaEmbeddingFunction":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,108 @@
+"""
+Unit tests for the agent's OpenAI-compatible chat loop
+"""
+import pytest
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agent.core import CodeAgent
+
+
+def _chunk(content=None, tool_calls=None):
+    delta = SimpleNamespace(content=content, tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+def _fragment(index, id=None, name=None, arguments=None):
+    return SimpleNamespace(index=index, id=id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+class StubSearchTool:
+    def search_codebase(self, query, n_results=5):
+        if query == "alloc":
+            # Finish last so results come back out of order
+            time.sleep(0.05)
+        return f"results for {query} ({n_results})"
+
+
+class StubCompletions:
+    def __init__(self, rounds):
+        self.rounds = list(rounds)
+        self.calls = []
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        return iter(self.rounds.pop(0))
+
+
+def _agent(rounds):
+    agent = CodeAgent.__new__(CodeAgent)
+    agent.provider = "openai"
+    agent.search_tool = StubSearchTool()
+    agent.model_name = "test-model"
+    agent.tools = []
+    agent.messages = [{"role": "system", "content": "system"}]
+    completions = StubCompletions(rounds)
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return agent, completions
+
+
+def test_stream_rebuilds_interleaved_tool_calls():
+    """Test split tool call fragments are joined by index and answered in order"""
+    agent, completions = _agent([
+        [
+            _chunk(content="Let me search."),
+            _chunk(tool_calls=[_fragment(0, id="call_a", name="search_codebase", arguments='{"que')]),
+            _chunk(tool_calls=[_fragment(1, id="call_b", name="search_codebase", arguments='{"query": ')]),
+            _chunk(tool_calls=[_fragment(2, id="call_c", name="read_file", arguments='{}')]),
+            _chunk(tool_calls=[_fragment(0, arguments='ry": "alloc"}')]),
+            _chunk(tool_calls=[_fragment(1, arguments='"free", "n_results": 2}')]),
+        ],
+        [
+            _chunk(content="Do"),
+            _chunk(content="ne"),
+        ],
+    ])
+
+    assert list(agent.chat_stream("How is memory managed?")) == ["Let me search.", "Do", "ne"]
+
+    assert len(completions.calls) == 2
+    assert all(call["stream"] for call in completions.calls)
+    assert agent.messages == [
+        {"role": "system", "content": "system"},
+        {"role": "user", "content": "How is memory managed?"},
+        {
+            "role": "assistant",
+            "content": "Let me search.",
+            "tool_calls": [
+                {"id": "call_a", "type": "function",
+                 "function": {"name": "search_codebase", "arguments": '{"query": "alloc"}'}},
+                {"id": "call_b", "type": "function",
+                 "function": {"name": "search_codebase", "arguments": '{"query": "free", "n_results": 2}'}},
+                {"id": "call_c", "type": "function",
+                 "function": {"name": "read_file", "arguments": '{}'}},
+            ],
+        },
+        {"tool_call_id": "call_a", "role": "tool", "name": "search_codebase", "content": "results for alloc (5)"},
+        {"tool_call_id": "call_b", "role": "tool", "name": "search_codebase", "content": "results for free (2)"},
+        {"tool_call_id": "call_c", "role": "tool", "name": "read_file", "content": "Error: Unknown tool 'read_file'"},
+        {"role": "assistant", "content": "Done"},
+    ]
+
+
+def test_stream_text_only_reply():
+    """Test a reply without tool calls ends the turn after one request"""
+    agent, completions = _agent([[_chunk(content="Hello")]])
+
+    assert list(agent.chat_stream("Hi")) == ["Hello"]
+    assert len(completions.calls) == 1
+    assert agent.messages[-1] == {"role": "assistant", "content": "Hello"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
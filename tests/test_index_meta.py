@@ -0,0 +1,73 @@
+"""
+Unit tests for index metadata persistence
+"""
+import pytest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from indexing.index_meta import IndexMeta
+
+
+@pytest.fixture
+def meta_path():
+    """Create a temporary metadata location"""
+    temp_dir = tempfile.mkdtemp()
+    yield IndexMeta.path_for(temp_dir, "/project")
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_save_appends_only_changes(meta_path):
+    """Test that a save after load appends records for changed entries only"""
+    hashes = {f"{i}.py": str(i) for i in range(10)}
+    meta = IndexMeta("/project", "sha1", dict(hashes))
+    meta.save(meta_path)
+    
+    meta = IndexMeta.load(meta_path, "/project", "sha1")
+    meta.file_hashes["0.py"] = "changed"
+    del meta.file_hashes["1.py"]
+    meta.save(meta_path)
+    
+    with open(meta_path) as f:
+        assert len(f.read().splitlines()) == 1 + 10 + 2
+    hashes["0.py"] = "changed"
+    del hashes["1.py"]
+    assert IndexMeta.load(meta_path, "/project", "sha1").file_hashes == hashes
+
+
+def test_stats_round_trip(meta_path):
+    """Test that file stats are saved with the hashes, including stat-only changes"""
+    meta = IndexMeta("/project", "sha1", {"a.py": "1", "b.py": "2"}, {"a.py": "10:100"})
+    meta.save(meta_path)
+    
+    meta = IndexMeta.load(meta_path, "/project", "sha1")
+    assert meta.file_stats == {"a.py": "10:100"}
+    meta.file_stats["a.py"] = "10:200"
+    meta.save(meta_path)
+    
+    meta = IndexMeta.load(meta_path, "/project", "sha1")
+    assert meta.file_hashes == {"a.py": "1", "b.py": "2"}
+    assert meta.file_stats == {"a.py": "10:200"}
+
+
+def test_load_skips_truncated_record(meta_path):
+    """Test that a record cut short by an interrupted save is ignored"""
+    meta = IndexMeta("/project", "sha1", {"a.py": "1"})
+    meta.save(meta_path)
+    with open(meta_path, 'ab') as f:
+        f.write(b'{"path": "b.py", "ha')
+    
+    meta = IndexMeta.load(meta_path, "/project", "sha1")
+    assert meta.file_hashes == {"a.py": "1"}
+    
+    meta.file_hashes["c.py"] = "3"
+    meta.save(meta_path)
+    assert IndexMeta.load(meta_path, "/project", "sha1").file_hashes == {"a.py": "1", "c.py": "3"}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -6,6 +6,7 @@ import sys
 import os
 import tempfile
 import shutil
+import subprocess
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
@@ -120,5 +121,310 @@ def test_search_after_indexing(sample_project, temp_db):
         indexing.vector_store.VectorStore.__init__ = original_init
 
 
+def test_reindex_skips_unchanged_files(sample_project, temp_db):
+    """Test that re-indexing only replaces entries of changed files"""
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        store = VectorStore(persist_path=temp_db)
+        c_ids = store.collection.get(where={"file_path": "sample.c"})['ids']
+        py_ids = store.collection.get(where={"file_path": "sample.py"})['ids']
+        assert len(py_ids) > 0
+        
+        # Change only the Python file
+        with open(os.path.join(sample_project, "sample.py"), 'w') as f:
+            f.write('def farewell(name):\n    return f"Bye, {name}!"\n')
+        CodeIndexer(sample_project).index_project()
+        
+        assert store.collection.get(where={"file_path": "sample.c"})['ids'] == c_ids
+        names = [m['name'] for m in store.collection.get(where={"file_path": "sample.py"})['metadatas']]
+        assert names == ['farewell']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+
+
+def test_reindex_skips_hashing_files_with_unchanged_stat(sample_project, temp_db):
+    """Test that files whose stat matches the last run are not read again"""
+    import indexing.indexer
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    original_hash = indexing.indexer.content_hash
+    hashed = []
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    def counting_hash(path):
+        hashed.append(os.path.basename(path))
+        return original_hash(path)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    indexing.indexer.content_hash = counting_hash
+    
+    try:
+        # Recently modified files are always hashed, so age them first
+        for name in ("sample.py", "sample.c"):
+            os.utime(os.path.join(sample_project, name), (1_000_000_000, 1_000_000_000))
+        CodeIndexer(sample_project).index_project()
+        assert sorted(hashed) == ["sample.c", "sample.py"]
+        
+        hashed.clear()
+        with open(os.path.join(sample_project, "sample.py"), 'a') as f:
+            f.write('\ndef extra():\n    pass\n')
+        os.utime(os.path.join(sample_project, "sample.py"), (1_000_000_100, 1_000_000_100))
+        CodeIndexer(sample_project).index_project()
+        assert hashed == ["sample.py"]
+        
+        # Replaced with different content of the same size and mtime, as cp -p would
+        hashed.clear()
+        c_file = os.path.join(sample_project, "sample.c")
+        with open(c_file) as f:
+            code = f.read()
+        with open(c_file + ".new", 'w') as f:
+            f.write(code.replace("factorial", "fuctorial"))
+        os.utime(c_file + ".new", (1_000_000_000, 1_000_000_000))
+        os.replace(c_file + ".new", c_file)
+        CodeIndexer(sample_project).index_project()
+        assert hashed == ["sample.c"]
+        
+        store = VectorStore(persist_path=temp_db)
+        names = [m['name'] for m in store.collection.get(where={"file_path": "sample.c"})['metadatas']]
+        assert names == ['fuctorial']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+        indexing.indexer.content_hash = original_hash
+
+
+def test_index_continues_past_unreadable_file(sample_project, temp_db, capsys):
+    """Test that a file that cannot be read is counted as an error and retried next run"""
+    import indexing.indexer
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    original_hash = indexing.indexer.content_hash
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    def failing_hash(path):
+        if os.path.basename(path) == "sample.c":
+            raise PermissionError(13, "Permission denied", path)
+        return original_hash(path)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    indexing.indexer.content_hash = failing_hash
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        assert "Errors: 1 files" in capsys.readouterr().out
+        
+        store = VectorStore(persist_path=temp_db)
+        files = {m['file_path'] for m in store.collection.get()['metadatas']}
+        assert files == {"sample.py"}
+        
+        indexing.indexer.content_hash = original_hash
+        CodeIndexer(sample_project).index_project()
+        out = capsys.readouterr().out
+        assert "Indexed: 1 files" in out
+        assert "Errors: 0 files" in out
+        files = {m['file_path'] for m in store.collection.get()['metadatas']}
+        assert files == {"sample.py", "sample.c"}
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+        indexing.indexer.content_hash = original_hash
+
+
+def test_file_saved_between_hashing_and_parsing(sample_project, temp_db):
+    """Test that a parse of newer content is not cached under the hash of older content"""
+    import indexing.indexer
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    original_hash_files = indexing.indexer.CodeIndexer._hash_files
+    sample_py = os.path.join(sample_project, "sample.py")
+    with open(sample_py) as f:
+        original_code = f.read()
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    def hash_then_edit(self, *args):
+        hashes = original_hash_files(self, *args)
+        with open(sample_py, 'w') as f:
+            f.write('def farewell(name):\n    return f"Bye, {name}!"\n')
+        return hashes
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    indexing.indexer.CodeIndexer._hash_files = hash_then_edit
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        indexing.indexer.CodeIndexer._hash_files = original_hash_files
+        
+        store = VectorStore(persist_path=temp_db)
+        names = [m['name'] for m in store.collection.get(where={"file_path": "sample.py"})['metadatas']]
+        assert names == ['farewell']
+        
+        # Going back to the content that was hashed must not reuse the newer parse
+        with open(sample_py, 'w') as f:
+            f.write(original_code)
+        CodeIndexer(sample_project).index_project()
+        
+        names = sorted(m['name'] for m in store.collection.get(where={"file_path": "sample.py"})['metadatas'])
+        assert names == ['Math', 'greet', 'multiply']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+        indexing.indexer.CodeIndexer._hash_files = original_hash_files
+
+
+def test_index_with_single_worker(sample_project, temp_db):
+    """Test that indexing without a process pool stores the same definitions"""
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project, workers=1).index_project()
+        
+        store = VectorStore(persist_path=temp_db)
+        names = sorted(m['name'] for m in store.collection.get()['metadatas'])
+        assert names == ['Math', 'factorial', 'greet', 'multiply']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+
+
+def test_index_with_worker_pool(sample_project, temp_db):
+    """Test that parsing in worker processes stores the same definitions"""
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project, workers=2).index_project()
+        
+        store = VectorStore(persist_path=temp_db)
+        names = sorted(m['name'] for m in store.collection.get()['metadatas'])
+        assert names == ['Math', 'factorial', 'greet', 'multiply']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+
+
+def test_invalid_worker_count(sample_project):
+    """Test that a worker count below 1 is rejected"""
+    with pytest.raises(ValueError):
+        CodeIndexer(sample_project, workers=0)
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_reindex_git_project_detects_unstaged_changes(sample_project, temp_db):
+    """Test that git blob hashes don't hide edits that are not staged"""
+    subprocess.run(["git", "init", "-q", sample_project], check=True)
+    subprocess.run(["git", "-C", sample_project, "add", "."], check=True)
+    
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        
+        with open(os.path.join(sample_project, "sample.py"), 'w') as f:
+            f.write('def farewell(name):\n    return f"Bye, {name}!"\n')
+        CodeIndexer(sample_project).index_project()
+        
+        store = VectorStore(persist_path=temp_db)
+        names = [m['name'] for m in store.collection.get(where={"file_path": "sample.py"})['metadatas']]
+        assert names == ['farewell']
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_staging_indexed_edit_reembeds_nothing(sample_project, temp_db, capsys):
+    """Test that a file keeps its hash when an already indexed edit is staged"""
+    subprocess.run(["git", "init", "-q", sample_project], check=True)
+    subprocess.run(["git", "-C", sample_project, "add", "."], check=True)
+    
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        
+        with open(os.path.join(sample_project, "sample.py"), 'w') as f:
+            f.write('def farewell(name):\n    return f"Bye, {name}!"\n')
+        CodeIndexer(sample_project).index_project()
+        assert "Indexed: 1 files" in capsys.readouterr().out
+        
+        subprocess.run(["git", "-C", sample_project, "add", "sample.py"], check=True)
+        CodeIndexer(sample_project).index_project()
+        out = capsys.readouterr().out
+        assert "Indexed: 0 files" in out
+        assert "Unchanged: 2 files" in out
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+
+
+@pytest.mark.skipif(shutil.which("git") is None, reason="git is not installed")
+def test_git_project_ignores_hash_algorithm_change(sample_project, temp_db, capsys):
+    """Test that installing or removing blake3 does not re-index a git project"""
+    subprocess.run(["git", "init", "-q", sample_project], check=True)
+    subprocess.run(["git", "-C", sample_project, "add", "sample.py"], check=True)
+    
+    import indexing.indexer
+    import indexing.vector_store
+    original_init = indexing.vector_store.VectorStore.__init__
+    original_algorithm = indexing.indexer.HASH_ALGORITHM
+    
+    def mock_init(self, collection_name="code_chunks", persist_path=None):
+        original_init(self, collection_name, persist_path or temp_db)
+    
+    indexing.vector_store.VectorStore.__init__ = mock_init
+    
+    try:
+        CodeIndexer(sample_project).index_project()
+        capsys.readouterr()
+        
+        indexing.indexer.HASH_ALGORITHM = "other-algorithm"
+        CodeIndexer(sample_project).index_project()
+        out = capsys.readouterr().out
+        assert "Indexed: 0 files" in out
+        assert "Unchanged: 2 files" in out
+        
+    finally:
+        indexing.vector_store.VectorStore.__init__ = original_init
+        indexing.indexer.HASH_ALGORITHM = original_algorithm
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
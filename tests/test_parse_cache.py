@@ -0,0 +1,92 @@
+"""
+Unit tests for the parse cache
+"""
+import pytest
+import sys
+import os
+import tempfile
+import shutil
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from indexing.parse_cache import ParseCache
+from indexing.schema import CodeNode
+
+
+@pytest.fixture
+def cache_path():
+    """Create a temporary cache location"""
+    temp_dir = tempfile.mkdtemp()
+    yield ParseCache.path_for(temp_dir)
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _node(name):
+    return CodeNode(
+        type="function", name=name, file_path="a.py", start_line=0, end_line=1,
+        content=f"def {name}(): pass", language="python", arguments=["x"], imports=["import os"]
+    )
+
+
+def test_put_and_get_round_trip(cache_path):
+    """Test cached nodes come back unchanged"""
+    cache = ParseCache(cache_path)
+    key = ParseCache.make_key("a.py", "abc")
+    cache.put_many({key: [_node("f"), _node("g")]})
+    
+    found = cache.get_many({"a.py": key, "b.py": ParseCache.make_key("b.py", "other")})
+    cache.close()
+    
+    assert list(found) == ["a.py"]
+    assert found["a.py"] == [_node("f"), _node("g")]
+
+
+def test_cache_persists_across_instances(cache_path):
+    """Test entries survive reopening the cache"""
+    key = ParseCache.make_key("a.py", "abc")
+    cache = ParseCache(cache_path)
+    cache.put_many({key: [_node("f")]})
+    cache.close()
+    
+    cache = ParseCache(cache_path)
+    assert cache.get_many({"a.py": key})["a.py"][0].name == "f"
+    cache.close()
+
+
+def test_entries_shared_by_same_content(cache_path):
+    """Test files with the same content share an entry but keep their own path"""
+    cache = ParseCache(cache_path)
+    cache.put_many({ParseCache.make_key("a.py", "abc"): [_node("f")]})
+    
+    found = cache.get_many({
+        "copy/a.py": ParseCache.make_key("copy/a.py", "abc"),
+        "b.py": ParseCache.make_key("b.py", "abc"),
+        "a.c": ParseCache.make_key("a.c", "abc"),
+    })
+    cache.close()
+    
+    assert sorted(found) == ["b.py", "copy/a.py"]
+    assert found["b.py"][0].file_path == "b.py"
+    assert found["copy/a.py"][0].file_path == "copy/a.py"
+    assert found["b.py"][0].name == "f"
+
+
+def test_least_recently_used_entries_evicted(cache_path):
+    """Test puts beyond max_entries drop the entries used longest ago"""
+    cache = ParseCache(cache_path, max_entries=2)
+    keys = [ParseCache.make_key(f"{name}.py", name) for name in ("a", "b", "c")]
+    cache.put_many({keys[0]: [_node("a")]})
+    cache.put_many({keys[1]: [_node("b")]})
+    # Reading "a" makes "b" the least recently used entry
+    cache.get_many({"a.py": keys[0]})
+    cache.put_many({keys[2]: [_node("c")]})
+    
+    found = cache.get_many({"a.py": keys[0], "b.py": keys[1], "c.py": keys[2]})
+    cache.close()
+    
+    assert sorted(found) == ["a.py", "c.py"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
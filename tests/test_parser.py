@@ -77,6 +77,35 @@ def test_parse_c_function():
     assert len(func_nodes) == 1
 
 
+def test_parse_c_macros():
+    """Test parsing C object-like and function-like macros"""
+    parser = CodeParser()
+    code = '''
+#define BUFFER_SIZE 4096
+#define MAX(a, b) ((a) > (b) ? (a) : (b))
+'''
+    nodes = parser.parse_file("sample.h", code)
+    macro_names = [n.name for n in nodes if n.type == 'macro']
+    assert macro_names == ['BUFFER_SIZE', 'MAX']
+
+
+def test_parse_c_function_after_non_ascii_comment():
+    """Test byte offsets stay correct when the source contains non-ASCII text"""
+    parser = CodeParser()
+    code = '''
+    /* 두 수를 더한다 */
+    int add(int a, int b) {
+        return a + b;
+    }
+    '''
+    nodes = parser.parse_file("sample.c", code)
+    func_nodes = [n for n in nodes if n.type == 'function']
+    assert len(func_nodes) == 1
+    assert func_nodes[0].name == 'add'
+    assert func_nodes[0].content.startswith('int add(int a, int b)')
+    assert func_nodes[0].docstring == '/* 두 수를 더한다 */'
+
+
 def test_parse_cpp_class():
     """Test parsing a C++ class"""
     parser = CodeParser()
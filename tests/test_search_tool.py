@@ -0,0 +1,94 @@
+"""
+Unit tests for the search tool
+"""
+import pytest
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import tools.search_tool
+from tools.search_tool import SearchTool
+
+
+class StubVectorStore:
+    """Returns the documents set on the class, recording every query."""
+    documents = []
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, query_text, n_results=5):
+        self.queries.append((query_text, n_results))
+        return {
+            'documents': [list(self.documents)],
+            'metadatas': [[
+                {'file_path': f"file{i}.py", 'type': 'function', 'name': f"func{i}", 'start_line': 1, 'end_line': 2}
+                for i in range(len(self.documents))
+            ]],
+        }
+
+
+@pytest.fixture
+def stub_store(monkeypatch):
+    """Make SearchTool use StubVectorStore"""
+    monkeypatch.setattr(tools.search_tool, "VectorStore", StubVectorStore)
+    monkeypatch.setattr(StubVectorStore, "documents", ["def func0(): pass"])
+    return StubVectorStore
+
+
+def test_first_result_returned_over_budget(stub_store):
+    """Test the best match is returned even when it alone exceeds max_chars"""
+    stub_store.documents = ["x" * 500, "y"]
+    output = SearchTool(max_chars=100).search_codebase("query")
+
+    assert "x" * 500 in output
+    assert "Result 2:" not in output
+
+
+def test_results_beyond_budget_dropped(stub_store):
+    """Test a later result that would exceed max_chars is left out"""
+    stub_store.documents = ["a" * 10, "b" * 500]
+    output = SearchTool(max_chars=200).search_codebase("query")
+
+    assert "Result 1:" in output
+    assert "a" * 10 in output
+    assert "Result 2:" not in output
+    assert len(output) <= 200
+
+
+def test_no_results(stub_store):
+    """Test the message returned when nothing matches"""
+    stub_store.documents = []
+    assert SearchTool().search_codebase("query") == "No relevant code found."
+
+
+def test_repeated_search_served_from_cache(stub_store):
+    """Test the same query and result count does not query the store again"""
+    tool = SearchTool()
+    first = tool.search_codebase("query", 3)
+
+    assert tool.search_codebase("query", 3) == first
+    assert tool.vector_store.queries == [("query", 3)]
+
+    tool.search_codebase("query", 5)
+    assert tool.vector_store.queries == [("query", 3), ("query", 5)]
+
+
+def test_oldest_cached_search_evicted(stub_store):
+    """Test the least recently used search is dropped beyond cache_size"""
+    tool = SearchTool(cache_size=2)
+    tool.search_codebase("q1")
+    tool.search_codebase("q2")
+    # Using q1 again makes q2 the oldest entry
+    tool.search_codebase("q1")
+    tool.search_codebase("q3")
+    tool.search_codebase("q1")
+    tool.search_codebase("q2")
+
+    assert [query for query, _ in tool.vector_store.queries] == ["q1", "q2", "q3", "q2"]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -59,6 +59,22 @@ def test_add_and_query_documents(temp_db):
     assert found_add, "Should find 'add' function when searching for 'add numbers'"
 
 
+def test_query_without_documents(temp_db):
+    """Test that a query can skip fetching the documents"""
+    store = VectorStore(collection_name="test", persist_path=temp_db)
+    store.add_documents(
+        ["def add(a, b): return a + b"],
+        [{"file_path": "test.py", "name": "add", "type": "function", "start_line": 1, "end_line": 1, "language": "python"}],
+        ["doc1"]
+    )
+    
+    results = store.query("add numbers", n_results=1, include=["metadatas", "distances"])
+    
+    assert results['documents'] is None
+    assert results['metadatas'][0][0]['name'] == "add"
+    assert len(results['distances'][0]) == 1
+
+
 def test_query_empty_store(temp_db):
     """Test querying an empty store"""
     store = VectorStore(collection_name="test", persist_path=temp_db)
@@ -77,5 +93,53 @@ def test_add_empty_documents(temp_db):
     store.add_documents([], [], [])
 
 
+def test_add_documents_writes_immediately(temp_db):
+    """Test add_documents stores everything without a flush, in batches"""
+    store = VectorStore(collection_name="test", persist_path=temp_db)
+    store.batch_size = 2
+    
+    documents = [f"def func_{i}(): pass" for i in range(3)]
+    metadatas = [
+        {"file_path": "test.py", "name": f"func_{i}", "type": "function", "start_line": i + 1, "end_line": i + 1, "language": "python"}
+        for i in range(3)
+    ]
+    ids = [f"doc{i}" for i in range(3)]
+    
+    store.add_documents(documents, metadatas, ids)
+    assert store.collection.count() == 3
+
+
+def test_add_documents_stream_batches_until_flush(temp_db):
+    """Test streamed documents are buffered and written in batches"""
+    store = VectorStore(collection_name="test", persist_path=temp_db)
+    store.batch_size = 2
+    
+    documents = [f"def func_{i}(): pass" for i in range(3)]
+    metadatas = [
+        {"file_path": "test.py", "name": f"func_{i}", "type": "function", "start_line": i + 1, "end_line": i + 1, "language": "python"}
+        for i in range(3)
+    ]
+    ids = [f"doc{i}" for i in range(3)]
+    
+    store.add_documents_stream(documents, metadatas, ids)
+    # One full batch is written, the last document waits in the buffer
+    assert store.collection.count() == 2
+    
+    store.flush()
+    assert store.collection.count() == 3
+
+
+def test_context_manager_flushes_stream(temp_db):
+    """Test leaving the with block writes buffered documents"""
+    with VectorStore(collection_name="test", persist_path=temp_db) as store:
+        store.add_documents_stream(
+            ["def hello(): pass"],
+            [{"file_path": "test.py", "name": "hello", "type": "function", "start_line": 1, "end_line": 1, "language": "python"}],
+            ["doc0"]
+        )
+        assert store.collection.count() == 0
+    assert store.collection.count() == 1
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])